@@ -0,0 +1,102 @@
+import math
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional - only needed for advising many listings at once
+    np = None
+
+# Smallest bid the market accepts, whatever the cargo's value
+MIN_BID = 1
+
+
+def minimum_bid(value, fraction):
+    """Smallest bid the market accepts on a cargo value, given the minimum_bid_fraction setting"""
+    return max(MIN_BID, math.ceil(value * fraction))
+
+
+def bid_tiers(config):
+    """(fraction of value, win chance) for each acceptance tier, highest first
+
+    A bid of at least fraction * value wins with that tier's chance -
+    the same step function CargoMarket.win_chance() applies.
+    """
+    settings = config["simulation_settings"]
+    thresholds = settings["cargo_acceptance_thresholds"]
+    return ((thresholds["high_chance"], settings["high_win_chance"]),
+            (thresholds["medium_chance"], settings["medium_win_chance"]),
+            (0.0, settings["low_win_chance"]))
+
+
+class BidAdvisor:
+    """Bids with the highest expected profit under the configured win chances
+
+    A won contract costs the bid and pays out the cargo's total value, so a
+    bid b on value v is worth chance(b) * (v - b). The chance only changes
+    at the tier thresholds, so within a tier the cheapest bid is best, and
+    the optimum is the best of one candidate per tier - an exact answer
+    without searching over bid amounts. Bids below the market's minimum
+    bid are not allowed, so each tier's candidate is raised to it.
+    """
+
+    def __init__(self, config):
+        self.tiers = None
+        self.floor = None
+        self.set_config(config)
+
+    def set_config(self, config):
+        """Switch to a new config, returning whether any advice changed
+
+        Only the thresholds and win chances matter, so configs that change
+        anything else leave every listing's advice as it was.
+        """
+        tiers = bid_tiers(config)
+        floor = config["simulation_settings"].get("minimum_bid_fraction", 0.0)
+        if (tiers, floor) == (self.tiers, self.floor):
+            return False
+        self.tiers = tiers
+        self.floor = floor
+        return True
+
+    def chance(self, bid, value):
+        """Win chance of a bid on a cargo value - the first tier whose threshold it reaches"""
+        for fraction, chance in self.tiers:
+            if bid >= value * fraction:
+                return chance
+        return self.tiers[-1][1]
+
+    def advise(self, value):
+        """Return (bid, win chance, expected profit) of the best bid on a cargo value"""
+        lowest = minimum_bid(value, self.floor)
+        best = None
+        for fraction, _ in self.tiers:
+            bid = max(lowest, math.ceil(value * fraction))
+            chance = self.chance(bid, value)
+            expected = chance * (value - bid)
+            if best is None or expected > best[2]:
+                best = (bid, chance, expected)
+        return best
+
+    def advise_many(self, values):
+        """Advise every cargo value in one pass, returning (bids, chances, expected profits)
+
+        With NumPy the three results are arrays computed tier by tier over
+        all values at once; without it they are lists.
+        """
+        if np is None:
+            advice = [self.advise(value) for value in values]
+            return [a[0] for a in advice], [a[1] for a in advice], [a[2] for a in advice]
+
+        values = np.asarray(values, dtype=np.int64)
+        lowest = np.maximum(MIN_BID, np.ceil(values * self.floor))
+        bids = np.array([np.maximum(lowest, np.ceil(values * fraction)) for fraction, _ in self.tiers],
+                        dtype=np.int64)
+        # A bid raised to the minimum may reach a higher tier than its own
+        chances = np.full(bids.shape, self.tiers[-1][1])
+        for fraction, chance in reversed(self.tiers):
+            chances[bids >= values * fraction] = chance
+        expected = chances * (values - bids)
+
+        # The first tier wins ties, like advise()
+        best = np.argmax(expected, axis=0)
+        columns = np.arange(len(values))
+        return bids[best, columns], chances[best, columns], expected[best, columns]
@@ -1,7 +1,36 @@
 import json
 import os
+import random
+import copy
+import hashlib
+import pickle
+import time
 
-def create_default_config():
+from cargo_sampling import AliasTable
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional - without it there are no range arrays to compile
+    np = None
+
+CONFIG_FILE = "cargo_config.json"
+
+# The compiled config is cached in CONFIG_FILE + CACHE_SUFFIX between runs
+CACHE_SUFFIX = ".cache"
+# Bump when CompiledConfig changes shape so stale caches are rebuilt
+CACHE_VERSION = 5
+
+# A file modified this close to when it was last hashed may have been edited again
+# without its mtime changing (filesystems keep mtimes as coarse as 2 seconds)
+RACY_MTIME_NS = 2 * 10**9
+
+# Default age in weeks at which resolved bids are archived
+BID_ARCHIVE_WEEKS = 4
+
+# (config path, cache path) -> ((mtime, size), digest, hashed at, CompiledConfig) for this process
+_config_cache = {}
+
+def create_default_config(path=CONFIG_FILE):
     """Create default configuration file if none exists"""
     config = {
         "cargo_types": {
@@ -35,7 +64,7 @@ def create_default_config():
         "simulation_settings": {
             "initial_cargo_listings": 15,
             "new_cargo_per_refresh": [3, 8],
-            "player_starting_credits": 10000,
+            "player_starting_credits": 1000000,
             "cargo_deadline_range_weeks": [2, 6],
             "cargo_acceptance_thresholds": {
                 "high_chance": 0.8,  # 80% of cargo value - 70% chance of winning
@@ -44,28 +73,311 @@ def create_default_config():
             },
             "high_win_chance": 0.7,
             "medium_win_chance": 0.4,
-            "low_win_chance": 0.2
+            "low_win_chance": 0.2,
+            "minimum_bid_fraction": 0.5,  # bids under 50% of cargo value are refused
+            "bid_archive_weeks": 4
+        },
+        # Relative posting frequency - anything not listed has weight 1
+        "sampling_weights": {
+            "cargo_types": {},
+            "destinations": {},
+            "shipping_companies": {}
         }
     }
     
-    with open("cargo_config.json", "w") as f:
+    with open(path, "w") as f:
         json.dump(config, f, indent=4)
     
     return config
 
-def load_config():
-    """Load configuration from file or create default if not exists"""
-    if os.path.exists("cargo_config.json"):
-        with open("cargo_config.json", "r") as f:
-            config = json.load(f)
+# Win chances each bid acceptance tier needs in simulation_settings
+WIN_CHANCES = ("high_win_chance", "medium_win_chance", "low_win_chance")
+
+
+def check_number(value, name, low=0, high=None, integer=False):
+    """Raise ValueError unless value is a number (an integer if asked) within [low, high]"""
+    if value is None:
+        raise ValueError(f"Config is missing {name}")
+    kinds = int if integer else (int, float)
+    if isinstance(value, bool) or not isinstance(value, kinds):
+        raise ValueError(f"{name} must be {'a whole number' if integer else 'a number'}, not {value!r}")
+    if value < low or (high is not None and value > high):
+        raise ValueError(f"{name} must be between {low} and {high}, not {value}" if high is not None
+                         else f"{name} must be at least {low}, not {value}")
+
+
+def check_range(value, name, low=0):
+    """Raise ValueError unless value is a [low, high] pair of whole numbers with low <= high"""
+    if value is None:
+        raise ValueError(f"Config is missing {name}")
+    if not isinstance(value, (list, tuple)) or len(value) != 2:
+        raise ValueError(f"{name} must be a [low, high] pair, not {value!r}")
+    for bound in value:
+        check_number(bound, name, low, integer=True)
+    if value[0] > value[1]:
+        raise ValueError(f"{name} must have low <= high, not {list(value)}")
+
+
+def check_section(raw, name, kind):
+    """Return raw[name], raising ValueError if it is missing or not of the given type"""
+    if not isinstance(raw.get(name), kind):
+        raise ValueError(f"Config needs a {name!r} {'section' if kind is dict else 'list'}")
+    return raw[name]
+
+
+def validate_config(raw):
+    """Raise ValueError if a raw config has anything missing or out of range that the game reads"""
+    for name, entry in check_section(raw, "cargo_types", dict).items():
+        if not isinstance(entry, dict):
+            raise ValueError(f"Cargo type {name} must have \"mass\" and \"value\" ranges")
+        check_range(entry.get("mass"), f"Mass of {name}", low=1)
+        check_range(entry.get("value"), f"Value of {name}")
+    for section in ("destinations", "shipping_companies"):
+        if not all(isinstance(name, str) for name in check_section(raw, section, list)):
+            raise ValueError(f"Every entry of {section} must be a name")
+
+    settings = check_section(raw, "simulation_settings", dict)
+    check_number(settings.get("initial_cargo_listings"), "initial_cargo_listings", integer=True)
+    check_number(settings.get("player_starting_credits"), "player_starting_credits", integer=True)
+    check_range(settings.get("new_cargo_per_refresh"), "new_cargo_per_refresh")
+    check_range(settings.get("cargo_deadline_range_weeks"), "cargo_deadline_range_weeks")
+    thresholds = check_section(settings, "cargo_acceptance_thresholds", dict)
+    for name in ("high_chance", "medium_chance"):
+        check_number(thresholds.get(name), name)
+    if thresholds["medium_chance"] > thresholds["high_chance"]:
+        raise ValueError("medium_chance can't be above high_chance")
+    for name in WIN_CHANCES:
+        check_number(settings.get(name), name, high=1)
+    # Settings added later are optional
+    if "minimum_bid_fraction" in settings:
+        check_number(settings["minimum_bid_fraction"], "minimum_bid_fraction")
+    if "bid_archive_weeks" in settings:
+        check_number(settings["bid_archive_weeks"], "bid_archive_weeks", integer=True)
+
+    weights = raw.get("sampling_weights", {})
+    if not isinstance(weights, dict):
+        raise ValueError("Config needs a 'sampling_weights' section")
+    for kind, kind_weights in weights.items():
+        if kind not in ("cargo_types", "destinations", "shipping_companies") or not isinstance(kind_weights, dict):
+            raise ValueError(f"Unknown sampling_weights entry {kind!r}")
+        for name, weight in kind_weights.items():
+            check_number(weight, f"Weight of {name}")
+
+
+# Attributes of CompiledConfig derived from each section of the JSON config
+SECTION_ATTRIBUTES = {
+    "cargo_types": ("cargo_types", "type_index", "mass_ranges", "value_ranges", "mass_array", "value_array"),
+    "destinations": ("destinations", "destination_index"),
+    "shipping_companies": ("shipping_companies", "company_index"),
+    "simulation_settings": ("deadline_weeks", "new_cargo_per_refresh", "bid_archive_weeks")
+}
+
+class CompiledConfig:
+    """Read-only configuration with the sampling tables cargo generation needs"""
+
+    def __init__(self, config, previous=None):
+        raw = copy.deepcopy(dict(config))
+        validate_config(raw)
+        self._set("raw", raw)
+        self._set("settings", raw["simulation_settings"])
+        raw.setdefault("sampling_weights", {})
+
+        # Sections unchanged since a previous config keep its derived tables
+        def unchanged(*path):
+            if previous is None:
+                return False
+            old, new = previous.raw, raw
+            for key in path:
+                old, new = old.get(key), new.get(key)
+            return old == new
+
+        for section, build in (("cargo_types", self.build_cargo_types),
+                               ("destinations", self.build_destinations),
+                               ("shipping_companies", self.build_shipping_companies),
+                               ("simulation_settings", self.build_settings)):
+            if unchanged(section):
+                for name in SECTION_ATTRIBUTES[section]:
+                    self._set(name, getattr(previous, name))
+            else:
+                build()
+
+        if len(self.cargo_types) < 1 or len(self.shipping_companies) < 1:
+            raise ValueError("Config needs at least one cargo type and one shipping company")
+        if len(self.destinations) < 2:
+            raise ValueError("Config needs at least two destinations")
+
+        self._set("names", {
+            "cargo_types": self.type_index,
+            "destinations": self.destination_index,
+            "shipping_companies": self.company_index
+        })
+
+        # Alias tables over the weights, missing entries count as 1
+        samplers = {}
+        for kind, index in self.names.items():
+            kind_weights = raw["sampling_weights"].setdefault(kind, {})
+            if unchanged(kind) and unchanged("sampling_weights", kind):
+                samplers[kind] = previous.samplers[kind]
+                continue
+            unknown = set(kind_weights) - set(index)
+            if unknown:
+                raise ValueError(f"Unknown {kind} in sampling_weights: {', '.join(sorted(unknown))}")
+            samplers[kind] = AliasTable(kind_weights.get(name, 1) for name in index)
+        self._set("samplers", samplers)
+        if sum(weight > 0 for weight in samplers["destinations"].weights) < 2:
+            raise ValueError("Config needs at least two destinations with a positive weight")
+
+    def build_cargo_types(self):
+        """Cargo types and their (low, high) mass and value ranges, by type index"""
+        cargo_types = self.raw["cargo_types"]
+        self._set("cargo_types", tuple(cargo_types.keys()))
+        self._set("type_index", {name: index for index, name in enumerate(self.cargo_types)})
+        self._set("mass_ranges", tuple(tuple(cargo_types[t]["mass"]) for t in self.cargo_types))
+        self._set("value_ranges", tuple(tuple(cargo_types[t]["value"]) for t in self.cargo_types))
+
+        # The same tables as NumPy arrays for vectorized generation
+        if np is not None:
+            self._set("mass_array", np.array(self.mass_ranges, dtype=np.int64))
+            self._set("value_array", np.array(self.value_ranges, dtype=np.int64))
+        else:
+            self._set("mass_array", None)
+            self._set("value_array", None)
+
+    def build_destinations(self):
+        """Worlds by index"""
+        self._set("destinations", tuple(self.raw["destinations"]))
+        self._set("destination_index", {name: index for index, name in enumerate(self.destinations)})
+
+    def build_shipping_companies(self):
+        """Shipping companies by index"""
+        self._set("shipping_companies", tuple(self.raw["shipping_companies"]))
+        self._set("company_index", {name: index for index, name in enumerate(self.shipping_companies)})
+
+    def build_settings(self):
+        """Simulation settings generation reads on every refresh"""
+        self._set("deadline_weeks", tuple(self.settings["cargo_deadline_range_weeks"]))
+        self._set("new_cargo_per_refresh", tuple(self.settings["new_cargo_per_refresh"]))
+        # Resolved bids older than this are archived (older configs don't set it)
+        self._set("bid_archive_weeks", self.settings.get("bid_archive_weeks", BID_ARCHIVE_WEEKS))
+
+    def _set(self, name, value):
+        object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CompiledConfig is read-only")
+
+    def __getitem__(self, key):
+        return self.raw[key]
+
+    def __contains__(self, key):
+        return key in self.raw
+
+    def get(self, key, default=None):
+        return self.raw.get(key, default)
+
+    def with_weight(self, kind, name, weight):
+        """Copy of the config with a different weight for a cargo type, world or shipping company
+
+        kind is "cargo_types", "destinations" or "shipping_companies". Only
+        that kind's sampler is copied; everything else is shared, and this
+        config is left as it is.
+        """
+        index = self.names[kind][name]
+        sampler = copy.deepcopy(self.samplers[kind])
+        if kind == "destinations" and weight <= 0 and \
+                sum(w > 0 for i, w in enumerate(sampler.weights) if i != index) < 2:
+            raise ValueError("Config needs at least two destinations with a positive weight")
+        sampler.set_weight(index, weight)
+
+        raw = dict(self.raw)
+        raw["sampling_weights"] = {k: dict(weights) for k, weights in self.raw["sampling_weights"].items()}
+        raw["sampling_weights"][kind][name] = weight
+
+        config = copy.copy(self)
+        config._set("raw", raw)
+        config._set("samplers", dict(self.samplers, **{kind: sampler}))
+        return config
+
+    def sample(self, kind, rng=random):
+        """Draw the index of a cargo type, world or shipping company by weight"""
+        return self.samplers[kind].sample(rng)
+
+    def sample_route(self, rng=random):
+        """Draw distinct (origin index, destination index) by world weight"""
+        worlds = self.samplers["destinations"]
+        origin = worlds.sample(rng)
+        # Redraw until the destination differs from the origin
+        destination = worlds.sample(rng)
+        while destination == origin:
+            destination = worlds.sample(rng)
+        return origin, destination
+
+
+def compile_config(config, previous=None):
+    """Return config as a CompiledConfig (unchanged if it already is one)"""
+    if isinstance(config, CompiledConfig):
+        return config
+    return CompiledConfig(config, previous)
+
+
+def config_key(path):
+    """Return the (mtime, size) of a config file, used to spot edits without reading it"""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def read_config_cache(cache_path):
+    """Return the (key, digest, hashed at, config) stored in a config cache file, or None"""
+    try:
+        with open(cache_path, "rb") as f:
+            version, *entry = pickle.load(f)
+    except (OSError, pickle.PickleError, EOFError, AttributeError, ImportError, ValueError, TypeError):
+        return None
+    if version != CACHE_VERSION or len(entry) != 4:
+        return None
+    return tuple(entry)
+
+
+def write_config_cache(cache_path, entry):
+    """Store a (key, digest, hashed at, config) entry, replacing the cache file in one step"""
+    temp_path = cache_path + ".tmp"
+    try:
+        with open(temp_path, "wb") as f:
+            pickle.dump((CACHE_VERSION,) + entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        # The cache only speeds up the next start - failing to write it is harmless
+        pass
+
+
+def load_config(path=CONFIG_FILE, cache_path=None, previous=None):
+    """Load the compiled configuration, creating the default file if there is none"""
+    if cache_path is None:
+        cache_path = path + CACHE_SUFFIX
+    if not os.path.exists(path):
+        create_default_config(path)
+
+    key = config_key(path)
+    cache_id = (os.path.abspath(path), os.path.abspath(cache_path))
+    cached = _config_cache.get(cache_id)
+    if not (cached and cached[0] == key):
+        cached = read_config_cache(cache_path) or cached
+    # An unchanged (mtime, size) is only trusted if the file was hashed well after its mtime
+    if cached and cached[0] == key and key[0] < cached[2] - RACY_MTIME_NS:
+        _config_cache[cache_id] = cached
+        return cached[3]
+
+    hashed_at = time.time_ns()
+    with open(path, "rb") as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    if cached and cached[1] == digest:
+        config = cached[3]
     else:
-        config = create_default_config()
-        
-    # Convert lists to tuples where needed for compatibility with original code
-    for cargo_type in config["cargo_types"]:
-        config["cargo_types"][cargo_type]["mass"] = tuple(config["cargo_types"][cargo_type]["mass"])
-        config["cargo_types"][cargo_type]["value"] = tuple(config["cargo_types"][cargo_type]["value"])
-    
+        # previous (the config in use) lets unchanged sections keep their compiled tables
+        config = compile_config(json.loads(data), previous)
+    _config_cache[cache_id] = (key, digest, hashed_at, config)
+    write_config_cache(cache_path, _config_cache[cache_id])
     return config
 
 if __name__ == "__main__":
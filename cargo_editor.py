@@ -1,17 +1,28 @@
-import json
 import os
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
-import csv
 from datetime import datetime, timedelta
 import random
 
+from cargo_config import load_config, CONFIG_FILE
+from cargo_store import CargoStore
+from cargo_save import (SqliteSave, is_sqlite_path, read_csv_save, write_csv_save,
+                        resolve_bids, SAVE_FILE)
+from cargo_view import CargoTreeView
+from cargo_worker import BackgroundTask
+
 class CargoEditor:
     def __init__(self, root):
         self.root = root
         self.root.title("Cargo Listings Editor")
         self.root.geometry("1200x700")
         
+        self.save_file = SAVE_FILE
+        # SQLite save file the cargo store was last synced with (None for CSV)
+        self.synced_path = None
+        # Background save in progress, if any
+        self.save_task = None
+        
         # Load configuration and cargo data
         self.load_config()
         self.load_cargo_data()
@@ -20,9 +31,9 @@ class CargoEditor:
         
     def load_config(self):
         """Load configuration from file"""
-        if os.path.exists("cargo_config.json"):
-            with open("cargo_config.json", "r") as f:
-                self.config = json.load(f)
+        if os.path.exists(CONFIG_FILE):
+            self.config = load_config()
+            self.save_file = self.config.get("save_file", SAVE_FILE)
         else:
             messagebox.showerror("Error", "Configuration file not found. Run the main simulator first.")
             self.root.destroy()
@@ -30,49 +41,23 @@ class CargoEditor:
             
     def load_cargo_data(self):
         """Load existing cargo data if available"""
-        self.cargo_list = []
+        self.cargo = CargoStore()
         
-        if os.path.exists("cargo_sim_save.csv"):
-            try:
-                with open("cargo_sim_save.csv", "r") as file:
-                    reader = csv.reader(file)
-                    
-                    in_cargo_section = False
-                    header_row = None
-                    
-                    for row in reader:
-                        if not row:
-                            continue
-                            
-                        if row[0] == "CARGO_DATA":
-                            in_cargo_section = True
-                            continue
-                        elif row[0] == "BID_DATA":
-                            in_cargo_section = False
-                            continue
-                            
-                        if in_cargo_section:
-                            if header_row is None:
-                                header_row = row
-                                continue
-                                
-                            cargo = {
-                                "id": int(row[0]),
-                                "cargo_type": row[1],
-                                "origin": row[2],
-                                "destination": row[3],
-                                "mass": int(row[4]),
-                                "value_per_ton": int(row[5]),
-                                "total_value": int(row[6]),
-                                "shipping_company": row[7],
-                                "posted_on": row[8],
-                                "deadline": row[9],
-                                "status": row[10]
-                            }
-                            self.cargo_list.append(cargo)
-            except Exception as e:
-                messagebox.showwarning("Warning", f"Error loading cargo data: {str(e)}")
-                self.cargo_list = []
+        if not os.path.exists(self.save_file):
+            return
+            
+        try:
+            if is_sqlite_path(self.save_file):
+                with SqliteSave(self.save_file) as save:
+                    self.cargo.extend(save.read_cargo())
+                self.synced_path = self.save_file
+            else:
+                # Stream just the cargo section - bids and player data aren't needed here
+                self.cargo.extend(cargo for section, cargo in read_csv_save(self.save_file, sections=("cargo",)))
+            self.cargo.clear_changes()
+        except Exception as e:
+            messagebox.showwarning("Warning", f"Error loading cargo data: {str(e)}")
+            self.cargo.clear()
                 
     def create_gui(self):
         # Main frame
@@ -84,33 +69,7 @@ class CargoEditor:
         cargo_frame.pack(fill=tk.BOTH, expand=True, pady=10)
         
         # Create treeview for cargo listings
-        columns = ("ID", "Cargo Type", "Origin", "Destination", "Mass (tons)", 
-                  "Value (cr/ton)", "Total Value", "Shipping Company", "Posted On", "Deadline", "Status")
-        
-        self.cargo_tree = ttk.Treeview(cargo_frame, columns=columns, show="headings")
-        
-        # Configure columns
-        self.cargo_tree.column("ID", width=40, anchor=tk.CENTER)
-        self.cargo_tree.column("Cargo Type", width=150)
-        self.cargo_tree.column("Origin", width=100)
-        self.cargo_tree.column("Destination", width=100)
-        self.cargo_tree.column("Mass (tons)", width=80, anchor=tk.CENTER)
-        self.cargo_tree.column("Value (cr/ton)", width=100, anchor=tk.CENTER)
-        self.cargo_tree.column("Total Value", width=100, anchor=tk.CENTER)
-        self.cargo_tree.column("Shipping Company", width=150)
-        self.cargo_tree.column("Posted On", width=100, anchor=tk.CENTER)
-        self.cargo_tree.column("Deadline", width=100, anchor=tk.CENTER)
-        self.cargo_tree.column("Status", width=100, anchor=tk.CENTER)
-        
-        # Configure headings
-        for col in columns:
-            self.cargo_tree.heading(col, text=col)
-        
-        # Add a scrollbar
-        scrollbar = ttk.Scrollbar(cargo_frame, orient=tk.VERTICAL, command=self.cargo_tree.yview)
-        self.cargo_tree.configure(yscroll=scrollbar.set)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.cargo_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.cargo_view = CargoTreeView(cargo_frame)
         
         # Control frame for buttons
         control_frame = ttk.Frame(main_frame, padding="5")
@@ -127,27 +86,15 @@ class CargoEditor:
         
     def update_cargo_display(self):
         """Update the cargo treeview with all listings"""
-        # Clear the existing items
-        for item in self.cargo_tree.get_children():
-            self.cargo_tree.delete(item)
-            
-        # Insert cargo listings
-        for cargo in self.cargo_list:
-            values = (
-                cargo["id"],
-                cargo["cargo_type"],
-                cargo["origin"],
-                cargo["destination"],
-                f"{cargo['mass']:,}",
-                f"{cargo['value_per_ton']:,}",
-                f"{cargo['total_value']:,}",
-                cargo["shipping_company"],
-                cargo["posted_on"],
-                cargo["deadline"],
-                cargo["status"]
-            )
-            self.cargo_tree.insert("", tk.END, values=values)
+        self.cargo_view.show(self.cargo)
             
+    def new_id(self):
+        """Return an unused cargo ID, reserved in a SQLite save file so the simulator can't take it too"""
+        if is_sqlite_path(self.save_file):
+            with SqliteSave(self.save_file) as save:
+                return save.reserve_ids(1, self.cargo.next_id())
+        return self.cargo.next_id()
+
     def add_cargo(self):
         """Add a new cargo listing"""
         # Create a new dialog window
@@ -161,9 +108,7 @@ class CargoEditor:
         form_frame.pack(fill=tk.BOTH, expand=True)
         
         # Get next available ID
-        next_id = 1
-        if self.cargo_list:
-            next_id = max(cargo["id"] for cargo in self.cargo_list) + 1
+        next_id = self.new_id()
             
         # Create form fields
         ttk.Label(form_frame, text="ID:").grid(row=0, column=0, sticky=tk.W, pady=5)
@@ -257,33 +202,29 @@ class CargoEditor:
                     messagebox.showwarning("Missing Data", "Please fill in all required fields.")
                     return
                     
-                self.cargo_list.append(cargo)
+                self.cargo.add(cargo)
                 self.update_cargo_display()
                 dialog.destroy()
                 
             except ValueError:
-                messagebox.showwarning("Invalid Input", "Mass and value must be numbers.")
+                messagebox.showwarning("Invalid Input", "Mass and value must be numbers and dates must be YYYY-MM-DD.")
         
         ttk.Button(button_frame, text="Add", command=save_new_cargo).pack(side=tk.RIGHT, padx=5)
         ttk.Button(button_frame, text="Cancel", command=dialog.destroy).pack(side=tk.RIGHT, padx=5)
         
     def edit_cargo(self):
         """Edit the selected cargo listing"""
-        selected_item = self.cargo_tree.selection()
-        if not selected_item:
+        cargo_id = self.cargo_view.selected_cargo_id()
+        if cargo_id is None:
             messagebox.showwarning("Selection Required", "Please select a cargo listing to edit.")
             return
             
-        # Get the cargo ID from the selected item
-        cargo_id = int(self.cargo_tree.item(selected_item[0], "values")[0])
-        
         # Find the cargo in our list
-        cargo_index = next((i for i, cargo in enumerate(self.cargo_list) if cargo["id"] == cargo_id), None)
-        if cargo_index is None:
+        cargo = self.cargo.get(cargo_id)
+        if cargo is None:
             messagebox.showerror("Error", "Cargo not found.")
             return
             
-        cargo = self.cargo_list[cargo_index]
         
         # Create a new dialog window
         dialog = tk.Toplevel(self.root)
@@ -346,7 +287,7 @@ class CargoEditor:
                 mass = int(mass_var.get())
                 value_per_ton = int(value_var.get())
                 
-                self.cargo_list[cargo_index] = {
+                self.cargo.replace({
                     "id": int(id_var.get()),
                     "cargo_type": cargo_type_var.get(),
                     "origin": origin_var.get(),
@@ -358,21 +299,21 @@ class CargoEditor:
                     "posted_on": posted_var.get(),
                     "deadline": deadline_var.get(),
                     "status": status_var.get()
-                }
+                })
                 
                 self.update_cargo_display()
                 dialog.destroy()
                 
             except ValueError:
-                messagebox.showwarning("Invalid Input", "Mass and value must be numbers.")
+                messagebox.showwarning("Invalid Input", "Mass and value must be numbers and dates must be YYYY-MM-DD.")
         
         ttk.Button(button_frame, text="Save", command=save_edited_cargo).pack(side=tk.RIGHT, padx=5)
         ttk.Button(button_frame, text="Cancel", command=dialog.destroy).pack(side=tk.RIGHT, padx=5)
     
     def delete_cargo(self):
         """Delete the selected cargo listing"""
-        selected_item = self.cargo_tree.selection()
-        if not selected_item:
+        cargo_id = self.cargo_view.selected_cargo_id()
+        if cargo_id is None:
             messagebox.showwarning("Selection Required", "Please select a cargo listing to delete.")
             return
             
@@ -380,11 +321,8 @@ class CargoEditor:
         if not messagebox.askyesno("Confirm Deletion", "Are you sure you want to delete this cargo listing?"):
             return
             
-        # Get the cargo ID from the selected item
-        cargo_id = int(self.cargo_tree.item(selected_item[0], "values")[0])
-        
         # Remove the cargo from our list
-        self.cargo_list = [cargo for cargo in self.cargo_list if cargo["id"] != cargo_id]
+        self.cargo.remove(cargo_id)
         self.update_cargo_display()
         
     def add_unusual_cargo(self):
@@ -400,9 +338,7 @@ class CargoEditor:
         form_frame.pack(fill=tk.BOTH, expand=True)
         
         # Get next available ID
-        next_id = 1
-        if self.cargo_list:
-            next_id = max(cargo["id"] for cargo in self.cargo_list) + 1
+        next_id = self.new_id()
             
         # Create form fields with more detailed options
         ttk.Label(form_frame, text="ID:").grid(row=0, column=0, sticky=tk.W, pady=5)
@@ -531,109 +467,73 @@ class CargoEditor:
                     messagebox.showwarning("Missing Data", "Please fill in all required fields.")
                     return
                     
-                self.cargo_list.append(cargo)
+                self.cargo.add(cargo)
                 self.update_cargo_display()
                 dialog.destroy()
                 
             except ValueError:
-                messagebox.showwarning("Invalid Input", "Mass and value must be numbers.")
+                messagebox.showwarning("Invalid Input", "Mass and value must be numbers and dates must be YYYY-MM-DD.")
         
         ttk.Button(button_frame, text="Add", command=save_unusual_cargo).pack(side=tk.RIGHT, padx=5)
         ttk.Button(button_frame, text="Cancel", command=dialog.destroy).pack(side=tk.RIGHT, padx=5)
         
     def save_changes(self):
-        """Save all changes to the cargo save file"""
-        try:
-            # First, load the existing save file to preserve other sections
-            player_credits = 10000
-            current_bids = {}
-            
-            if os.path.exists("cargo_sim_save.csv"):
-                with open("cargo_sim_save.csv", "r") as file:
-                    reader = csv.reader(file)
-                    
-                    section = None
-                    
-                    for row in reader:
-                        if not row:
-                            continue
-                            
-                        if row[0] == "CARGO_DATA":
-                            section = "cargo"
-                            continue
-                        elif row[0] == "BID_DATA":
-                            section = "bids"
-                            continue
-                        elif row[0] == "PLAYER_DATA":
-                            section = "player"
-                            continue
-                            
-                        if section == "bids" and row[0] != "cargo_id":
-                            cargo_id = int(row[0])
-                            
-                            # Find the corresponding cargo
-                            cargo = next((c for c in self.cargo_list if c["id"] == cargo_id), None)
-                            
-                            if cargo:
-                                current_bids[cargo_id] = {
-                                    "amount": int(row[1]),
-                                    "status": row[2],
-                                    "bid_date": row[3],
-                                    "cargo": cargo
-                                }
-                        elif section == "player" and row[0] != "credits":
-                            player_credits = int(row[0])
-            
-            # Now write the updated file
-            with open("cargo_sim_save.csv", "w", newline="") as file:
-                writer = csv.writer(file)
-                
-                # Write header row
-                writer.writerow(["CARGO_DATA"])
-                writer.writerow(["id", "cargo_type", "origin", "destination", "mass", 
-                                "value_per_ton", "total_value", "shipping_company", 
-                                "posted_on", "deadline", "status"])
-                
-                # Write cargo data
-                for cargo in self.cargo_list:
-                    row = [
-                        cargo["id"],
-                        cargo["cargo_type"],
-                        cargo["origin"],
-                        cargo["destination"],
-                        cargo["mass"],
-                        cargo["value_per_ton"],
-                        cargo["total_value"],
-                        cargo["shipping_company"],
-                        cargo["posted_on"],
-                        cargo["deadline"],
-                        cargo["status"]
-                    ]
-                    writer.writerow(row)
-                    
-                # Write bid data
-                writer.writerow(["BID_DATA"])
-                writer.writerow(["cargo_id", "amount", "status", "bid_date"])
-                
-                for cargo_id, bid_info in current_bids.items():
-                    writer.writerow([
-                        cargo_id,
-                        bid_info["amount"],
-                        bid_info["status"],
-                        bid_info["bid_date"]
-                    ])
-                    
-                # Write player data
-                writer.writerow(["PLAYER_DATA"])
-                writer.writerow(["credits"])
-                writer.writerow([player_credits])
-                
+        """Save all changes to the cargo save file on a worker thread"""
+        if self.save_task and self.save_task.running():
+            messagebox.showinfo("Busy", "Please wait for the current save to finish.")
+            return
+
+        # Write a copy, so editing can go on while the file is written
+        cargo = self.cargo.copy()
+        path = self.save_file
+        synced_path = self.synced_path
+        full = synced_path != path
+        self.cargo.clear_changes()
+        self.synced_path = path if is_sqlite_path(path) else None
+
+        if is_sqlite_path(path):
+            work = lambda report: self.write_sqlite(cargo, path, full)
+        else:
+            credits = self.config["simulation_settings"]["player_starting_credits"]
+            work = lambda report: self.write_csv(cargo, path, credits)
+
+        def done(result):
             messagebox.showinfo("Success", "Cargo listings saved successfully.")
-        except Exception as e:
-            messagebox.showerror("Save Error", f"Error saving cargo data: {str(e)}")
+
+        def failed(error):
+            # The next save has to write the failed save's changes again
+            self.cargo.restore_changes(cargo)
+            self.synced_path = synced_path
+            messagebox.showerror("Save Error", f"Error saving cargo data: {str(error)}")
+
+        self.save_task = BackgroundTask(self.root, work, on_done=done, on_error=failed)
+
+    @staticmethod
+    def write_csv(cargo, path, credits):
+        """Rewrite a CSV save with new cargo, keeping its bids and player data (credits for a new save)"""
+        # First, stream the other sections of the existing save file to preserve them
+        player = {"credits": credits}
+        bid_rows = []
+
+        if os.path.exists(path):
+            for section, record in read_csv_save(path, sections=("bids", "player")):
+                if section == "bids":
+                    bid_rows.append(record)
+                else:
+                    player = record
+
+        # Now write the updated file
+        write_csv_save(path, cargo, resolve_bids(bid_rows, cargo), player)
+
+    @staticmethod
+    def write_sqlite(cargo, path, full):
+        """Upsert the edited cargo rows (every row if full), leaving bids, player data and the simulator's listings untouched"""
+        with SqliteSave(path) as save:
+            with save.conn:
+                save.write_cargo(cargo, full)
 
 if __name__ == "__main__":
     root = tk.Tk()
     app = CargoEditor(root)
     root.mainloop()
-                                                        
\ No newline at end of file
+                                                        
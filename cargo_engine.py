@@ -0,0 +1,818 @@
+import copy
+import random
+import heapq
+import hashlib
+import inspect
+from collections import deque
+from functools import wraps
+from array import array
+from datetime import date
+
+from cargo_config import compile_config
+from cargo_advisor import BidAdvisor, minimum_bid
+from cargo_store import CargoStore, RecordList, COLUMN_TYPES, date_to_ordinal, ordinal_to_date
+from cargo_save import (SqliteSave, is_sqlite_path, read_save, write_csv_save, append_bid_archive,
+                        resolve_bids, parse_cargo_row, parse_archive_row, SAVE_FILE, ARCHIVE_SUFFIX)
+from cargo_journal import Journal, read_journal, discard_journal
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional - only needed for bulk generation
+    np = None
+
+# Below this many listings the plain Python loop is cheaper than NumPy setup
+BATCH_THRESHOLD = 64
+
+# Most recent market events kept for the GUI to drain (older ones are dropped)
+EVENT_QUEUE_SIZE = 10000
+
+
+def player_action(method):
+    """Record calls of a market method in its action log
+
+    Only the outermost call is recorded - advance_weeks() calling
+    advance_time() is one action - and only if it succeeded. Keyword
+    arguments are recorded by position, so the log replays as plain calls.
+    """
+    signature = inspect.signature(method)
+
+    @wraps(method)
+    def action(self, *args, **kwargs):
+        if self.acting or self.actions is None:
+            return method(self, *args, **kwargs)
+        bound = signature.bind(self, *args, **kwargs)
+        self.acting = True
+        try:
+            result = method(*bound.args, **bound.kwargs)
+        finally:
+            self.acting = False
+        self.actions.append([method.__name__] + list(bound.args[1:]))
+        return result
+    return action
+
+
+def derive_seed(seed, stream):
+    """Integer seed for one named random stream of a market seed"""
+    return int.from_bytes(hashlib.sha256(f"{seed}/{stream}".encode()).digest()[:8], "big")
+
+
+class CargoMarket:
+    """Headless cargo market - listings, bids and bid resolution without any GUI
+
+    All randomness comes from streams seeded from one market seed, and
+    with record_actions player actions are recorded in an action log, so a
+    game can be replayed exactly from action_log() (see cargo_replay.py).
+    """
+
+    def __init__(self, config, seed=None, start_date=None, record_actions=False, queue_events=False,
+                 id_path=None):
+        self.config = compile_config(config)
+        # The config the action log starts from (only kept while recording)
+        self.initial_config = copy.deepcopy(self.config.raw) if record_actions else None
+        # Best bids under the configured win chances
+        self.advisor = BidAdvisor(self.config)
+
+        # Market state
+        self.cargo = CargoStore()
+        self.player_credits = self.config.settings["player_starting_credits"]
+        self.current_bids = {}
+        # Cargo IDs of bids still waiting to be resolved (a dict keeps them in bid order)
+        self.pending_bids = {}
+
+        # Totals of resolved bids moved out of current_bids by archive_bids(). The
+        # bids themselves go to the archive file next to the save when the game is
+        # next saved - a market without a save file (e.g. a headless campaign) only
+        # keeps the totals
+        self.archived = {"accepted": 0, "rejected": 0, "accepted_value": 0}
+        self.archive_path = None
+        # Archived bids waiting for the next save, as archive rows by (cargo ID, bid date) -
+        # a listing can be bid on again once a rejected bid on it was archived
+        self.archive_rows = {}
+        # Save file this game was last saved to or fully loaded from (None for a fresh market)
+        self.save_path = None
+        # SQLite save file new cargo IDs are reserved from, so they never clash with
+        # listings the cargo editor adds to it - and the lowest ID to use next
+        self.id_path = id_path if id_path is not None and is_sqlite_path(id_path) else None
+        self.id_floor = 0
+
+        # Game clock as a day ordinal - it only moves when time is advanced
+        self.start_date = start_date if start_date is not None else date.today().toordinal()
+        self.today = self.start_date
+
+        # Min-heap of deadline day ordinals with the IDs expiring on each day, and
+        # IDs that left the market since the last refresh - so refreshing never
+        # rescans the whole market
+        self.expiry = []
+        self.expiry_ids = {}
+        self.settled = set()
+
+        # Bids changed since the last save, and the SQLite save they were synced to
+        self.changed_bids = set()
+        self.synced_path = None
+        # Set when only part of a save was loaded, so it can't be saved back
+        self.partial = False
+        # Journal of changes since the save file was last written (None until a save or load)
+        self.journal = None
+
+        # Bid resolutions and expiries for subscribers, and queued for a GUI to drain if it asks
+        self.events = deque(maxlen=EVENT_QUEUE_SIZE) if queue_events else None
+        self.subscribers = []
+
+        # Separate random streams for generating cargo and resolving bids, so
+        # a change to one doesn't shift the other
+        self.seed = seed if seed is not None else random.randrange(2 ** 63)
+        self.generation_rng = random.Random(derive_seed(self.seed, "generation"))
+        self.bid_rng = random.Random(derive_seed(self.seed, "bids"))
+        # Stream for vectorized generation (only with NumPy)
+        self.np_rng = np.random.default_rng(derive_seed(self.seed, "batch")) if np is not None else None
+
+        # Player actions since the market was created, as [method name, args...],
+        # or None when not recording - the log grows for as long as the market runs
+        self.actions = [] if record_actions else None
+        self.acting = False
+
+    def set_config(self, config):
+        """Switch to a new config without touching the market
+
+        Listings already posted keep their values; only cargo generated from
+        now on and bid resolution use the new config. Returns whether bid
+        advice changed.
+        """
+        config = compile_config(config)
+        # The advisor reads the config first, so a config it can't use changes nothing
+        changed = self.advisor.set_config(config)
+        self.config = config
+        if self.actions is not None:
+            self.record("set_config", copy.deepcopy(self.config.raw))
+        return changed
+
+    @player_action
+    def set_weight(self, kind, name, weight):
+        """Change how often a cargo type, world or shipping company is drawn from now on"""
+        self.config = self.config.with_weight(kind, name, weight)
+
+    def record(self, name, *args):
+        """Add an action to the action log, unless it happens inside another action"""
+        if self.actions is not None and not self.acting:
+            self.actions.append([name] + list(args))
+
+    def action_log(self):
+        """Everything needed to replay this market: seed, start, config and actions"""
+        if self.actions is None:
+            raise ValueError("The market wasn't created with record_actions=True")
+        return {
+            "seed": self.seed,
+            "start_date": self.start_date,
+            "numpy": np is not None,
+            "config": self.initial_config,
+            "actions": copy.deepcopy(self.actions)
+        }
+
+    def state_digest(self):
+        """SHA-256 of the market state, for checking that a replay matches"""
+        digest = hashlib.sha256()
+        for row in self.cargo.rows():
+            digest.update(repr(row).encode())
+        for cargo_id in sorted(self.current_bids):
+            bid = self.current_bids[cargo_id]
+            digest.update(repr((cargo_id, bid["amount"], bid["status"], bid["bid_date"])).encode())
+        digest.update(repr((self.player_credits, self.today)).encode())
+        return digest.hexdigest()
+
+    @player_action
+    def generate_cargo(self, count=5):
+        """Generate random cargo listings and return the new ones"""
+        if np is not None and count >= BATCH_THRESHOLD:
+            return self.post_batch(self.generate_cargo_batch(count))
+
+        config = self.config
+        rng = self.generation_rng
+        next_id = self.new_ids(count)
+
+        new_cargo = []
+        current_date = ordinal_to_date(self.today)
+        # Random deadline between configured weeks from now - format each possible one once
+        weeks_low, weeks_high = config.deadline_weeks
+        deadlines = {weeks: ordinal_to_date(self.today + weeks * 7)
+                     for weeks in range(weeks_low, weeks_high + 1)}
+
+        for _ in range(count):
+            type_index = config.sample("cargo_types", rng)
+            mass_range = config.mass_ranges[type_index]
+            value_range = config.value_ranges[type_index]
+
+            mass = rng.randint(mass_range[0], mass_range[1])
+            value_per_ton = rng.randint(value_range[0], value_range[1])
+
+            # Origin and destination should be different
+            origin, destination = config.sample_route(rng)
+
+            cargo = {
+                "id": next_id,
+                "cargo_type": config.cargo_types[type_index],
+                "origin": config.destinations[origin],
+                "destination": config.destinations[destination],
+                "mass": mass,
+                "value_per_ton": value_per_ton,
+                "total_value": mass * value_per_ton,
+                "shipping_company": config.shipping_companies[config.sample("shipping_companies", rng)],
+                "posted_on": current_date,
+                "deadline": deadlines[rng.randint(weeks_low, weeks_high)],
+                "status": "Available"
+            }
+
+            new_cargo.append(cargo)
+            next_id += 1
+
+        return self.post_cargo(new_cargo)
+
+    def new_ids(self, count):
+        """Return the first of count unused cargo IDs, reserving them in the SQLite save file if there is one"""
+        first_id = max(self.cargo.next_id(), self.id_floor)
+        if self.id_path is not None:
+            with SqliteSave(self.id_path) as save:
+                reserved = save.reserve_ids(count, first_id)
+            # A replay has no save file to reserve from, so it has to skip the same IDs
+            if reserved != first_id and self.actions is not None:
+                self.actions.append(["skip_ids", reserved])
+            first_id = reserved
+        return first_id
+
+    def skip_ids(self, first_id):
+        """Start the next new cargo IDs at first_id or later"""
+        self.id_floor = first_id
+
+    def post_cargo(self, new_cargo):
+        """Add listings to the market, schedule their expiry and return their records"""
+        self.cargo.extend(new_cargo)
+        for cargo in new_cargo:
+            self.schedule_expiry(date_to_ordinal(cargo["deadline"]), [cargo["id"]])
+        records = [self.cargo.get(cargo["id"]) for cargo in new_cargo]
+        if self.journal is not None:
+            self.journal.write_many("cargo", self.cargo.rows(records))
+        return records
+
+    def schedule_expiry(self, deadline, cargo_ids):
+        """Queue listings to expire once the given day ordinal has been reached"""
+        bucket = self.expiry_ids.get(deadline)
+        if bucket is None:
+            bucket = self.expiry_ids[deadline] = array("q")
+            heapq.heappush(self.expiry, deadline)
+        bucket.extend(cargo_ids)
+
+    def reindex(self):
+        """Rebuild the expiry buckets and settled set after the store was replaced"""
+        store = self.cargo
+        self.expiry = []
+        self.expiry_ids = {}
+        self.settled = set()
+
+        available = store.categories["status"].codes.get("Available")
+        for cargo_id, deadline, status, alive in zip(store.ids, store.columns["deadline"],
+                                                     store.columns["status"], store.alive):
+            if alive:
+                self.schedule_expiry(deadline, [cargo_id])
+                if status != available:
+                    self.settled.add(cargo_id)
+
+    def drop_cargo(self, cargo_id):
+        """Remove a listing from the market, returning whether it was there
+
+        A bid that refers to the listing keeps a copy of it.
+        """
+        bid = self.current_bids.get(cargo_id)
+        if bid is None:
+            return self.cargo.discard(cargo_id)
+        cargo = self.cargo.remove(cargo_id)
+        if cargo is not None:
+            bid["cargo"] = cargo
+        return cargo is not None
+
+    def log(self, kind, *values):
+        """Append a change to the journal, if there is one"""
+        if self.journal is not None:
+            self.journal.write(kind, *values)
+
+    def log_bid(self, cargo_id):
+        """Journal the current state of a bid"""
+        bid = self.current_bids[cargo_id]
+        self.log("bid", cargo_id, bid["amount"], bid["status"], bid["bid_date"])
+
+    def subscribe(self, callback):
+        """Call callback(event) for every market event from now on"""
+        self.subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        """Stop calling a subscribed callback"""
+        self.subscribers.remove(callback)
+
+    def emit(self, kind, cargo_id, **details):
+        """Queue a market event and pass it to the subscribers
+
+        Events are dicts with "kind" ("bid_accepted", "bid_rejected" or
+        "cargo_expired"), "date" (a day ordinal), "cargo_id" and, for bid
+        events, "bid". Nothing is built when no one is listening.
+        """
+        if self.events is None and not self.subscribers:
+            return
+        event = {"kind": kind, "date": self.today, "cargo_id": cargo_id}
+        event.update(details)
+        if self.events is not None:
+            self.events.append(event)
+        for callback in self.subscribers:
+            callback(event)
+
+    def drain_events(self):
+        """Return the queued events, oldest first, and empty the queue"""
+        if self.events is None:
+            raise ValueError("The market wasn't created with queue_events=True")
+        events = list(self.events)
+        self.events.clear()
+        return events
+
+    def generate_cargo_batch(self, count):
+        """Draw count listings at once as NumPy columns (same distributions as generate_cargo)
+
+        The listings are not added to the market - pass them to post_batch.
+        Categorical columns hold indexes into the "cargo_types",
+        "destinations" and "shipping_companies" config lists.
+        """
+        if np is None:
+            raise RuntimeError("NumPy is required for batch cargo generation")
+
+        rng = self.np_rng
+        config = self.config
+        mass_ranges = config.mass_array
+        value_ranges = config.value_array
+        worlds = config.samplers["destinations"]
+
+        cargo_type = config.samplers["cargo_types"].sample_array(rng, count)
+        mass = rng.integers(mass_ranges[cargo_type, 0], mass_ranges[cargo_type, 1] + 1)
+        value_per_ton = rng.integers(value_ranges[cargo_type, 0], value_ranges[cargo_type, 1] + 1)
+
+        # Redraw destinations that landed on their origin
+        origin = worlds.sample_array(rng, count)
+        destination = worlds.sample_array(rng, count)
+        same = np.flatnonzero(destination == origin)
+        while same.size:
+            destination[same] = worlds.sample_array(rng, same.size)
+            same = same[destination[same] == origin[same]]
+
+        weeks_range = config.deadline_weeks
+        deadline_weeks = rng.integers(weeks_range[0], weeks_range[1] + 1, count)
+
+        first_id = self.new_ids(count)
+        return {
+            "id": np.arange(first_id, first_id + count),
+            "cargo_type": cargo_type,
+            "origin": origin,
+            "destination": destination,
+            "mass": mass,
+            "value_per_ton": value_per_ton,
+            "total_value": mass * value_per_ton,
+            "shipping_company": config.samplers["shipping_companies"].sample_array(rng, count),
+            "deadline_weeks": deadline_weeks
+        }
+
+    def post_batch(self, batch):
+        """Add the columns from generate_cargo_batch to the market without building dicts"""
+        store = self.cargo
+        config = self.config
+
+        # Map config list indexes to the store's category codes
+        def codes(field, names, indexes):
+            return column(field, np.array([store.categories[field].code(name) for name in names])[indexes])
+
+        # Copy a NumPy column straight into an array with the store's type code
+        def column(field, values):
+            result = array(COLUMN_TYPES.get(field, "q"))
+            result.frombytes(np.asarray(values, dtype=result.typecode).tobytes())
+            return result
+
+        today = self.today
+        count = len(batch["id"])
+        deadlines = batch["deadline_weeks"] * 7 + today
+
+        ids = column("id", batch["id"])
+        first_row = len(store.ids)
+        store.extend_encoded(ids, {
+            "cargo_type": codes("cargo_type", config.cargo_types, batch["cargo_type"]),
+            "origin": codes("origin", config.destinations, batch["origin"]),
+            "destination": codes("destination", config.destinations, batch["destination"]),
+            "mass": column("mass", batch["mass"]),
+            "value_per_ton": column("value_per_ton", batch["value_per_ton"]),
+            "total_value": column("total_value", batch["total_value"]),
+            "shipping_company": codes("shipping_company", config.shipping_companies,
+                                      batch["shipping_company"]),
+            "posted_on": column("posted_on", np.full(count, today)),
+            "deadline": column("deadline", deadlines),
+            "status": column("status", np.full(count, store.categories["status"].code("Available")))
+        })
+
+        # Only a handful of distinct deadlines, so schedule each group at once
+        for deadline in np.unique(deadlines).tolist():
+            self.schedule_expiry(deadline, batch["id"][deadlines == deadline].tolist())
+
+        if self.journal is not None:
+            self.journal.write_many("cargo", store.rows(start=first_row))
+
+        return RecordList(store, ids)
+
+    @property
+    def cargo_list(self):
+        """All cargo listings in the order they were posted"""
+        return list(self.cargo)
+
+    def available_cargo(self):
+        """Return the listings that are still open for bidding"""
+        return self.cargo.with_status("Available")
+
+    def get_cargo(self, cargo_id):
+        """Find a cargo listing by ID, or None if it doesn't exist"""
+        return self.cargo.get(cargo_id)
+
+    @player_action
+    def refresh_listings(self):
+        """Refresh cargo listings - remove old ones and add new ones"""
+        # Remove listings that were contracted since the last refresh
+        dropped = []
+        for cargo_id in self.settled:
+            if self.drop_cargo(cargo_id):
+                dropped.append((cargo_id,))
+        self.settled.clear()
+
+        # Remove expired listings, a whole day's bucket at a time
+        today = self.today
+        while self.expiry and self.expiry[0] <= today:
+            deadline = heapq.heappop(self.expiry)
+            for cargo_id in self.expiry_ids.pop(deadline):
+                row = self.cargo.row_of(cargo_id)
+                # Skip listings already gone or given a new deadline
+                if row is not None and self.cargo.columns["deadline"][row] == deadline:
+                    self.drop_cargo(cargo_id)
+                    self.emit("cargo_expired", cargo_id)
+                    dropped.append((cargo_id,))
+
+        if dropped and self.journal is not None:
+            self.journal.write_many("drop", dropped)
+
+        # Generate new cargo
+        new_cargo_range = self.config.new_cargo_per_refresh
+        return self.generate_cargo(self.generation_rng.randint(new_cargo_range[0], new_cargo_range[1]))
+
+    def suggested_bid(self, cargo):
+        """Suggested bid amount for a listing - the one with the highest expected profit"""
+        return self.advisor.advise(cargo["total_value"])[0]
+
+    def minimum_bid(self, cargo_value):
+        """Smallest bid accepted on a cargo of the given value"""
+        return minimum_bid(cargo_value, self.config.settings.get("minimum_bid_fraction", 0.0))
+
+    def available_credits(self, except_cargo=None):
+        """Credits not tied up in pending bids (other than one on except_cargo)"""
+        return self.player_credits - sum(self.current_bids[cargo_id]["amount"] for cargo_id in self.pending_bids
+                                         if cargo_id != except_cargo)
+
+    @player_action
+    def place_bid(self, cargo_id, amount):
+        """Record a bid on a cargo listing and return it"""
+        cargo = self.get_cargo(cargo_id)
+        if cargo is None:
+            raise KeyError(f"Cargo {cargo_id} not found")
+        lowest = self.minimum_bid(cargo["total_value"])
+        if amount < lowest:
+            raise ValueError(f"Bids on this cargo must be at least {lowest:,} credits")
+        # A won contract is paid for when it is accepted, so bids can't promise more than the player has
+        available = self.available_credits(except_cargo=cargo_id)
+        if amount > available:
+            raise ValueError(f"A bid of {amount:,} credits is more than the {available:,} credits available")
+
+        bid = {
+            "amount": amount,
+            "cargo": cargo,
+            "status": "Pending",
+            "bid_date": ordinal_to_date(self.today)
+        }
+        self.current_bids[cargo_id] = bid
+        self.pending_bids[cargo_id] = None
+        self.changed_bids.add(cargo_id)
+        self.log_bid(cargo_id)
+        return bid
+
+    def win_chance(self, amount, cargo_value):
+        """Chance that a bid of the given amount wins a cargo of the given value"""
+        settings = self.config.settings
+        thresholds = settings["cargo_acceptance_thresholds"]
+
+        if amount >= cargo_value * thresholds["high_chance"]:
+            return settings["high_win_chance"]
+        elif amount >= cargo_value * thresholds["medium_chance"]:
+            return settings["medium_win_chance"]
+        else:
+            return settings["low_win_chance"]
+
+    def game_date(self, days_to_add=0):
+        """The current game date (optionally some days ahead) as a date"""
+        return date.fromordinal(self.today + days_to_add)
+
+    @player_action
+    def advance_time(self):
+        """Advance one week and resolve pending bids, returning the accepted ones"""
+        accepted = self.resolve_pending_bids()
+        self.today += 7
+        self.log("date", self.today)
+        self.archive_bids()
+        return accepted
+
+    @player_action
+    def archive_bids(self):
+        """Move resolved bids past the archive age out of current_bids for the next save, returning how many"""
+        cutoff = ordinal_to_date(self.today - self.config.bid_archive_weeks * 7)
+        archived = [cargo_id for cargo_id, bid in self.current_bids.items()
+                    if bid["status"] != "Pending" and bid["bid_date"] <= cutoff]
+        if not archived:
+            return 0
+
+        totals = self.archived
+        rows = []
+        for cargo_id in archived:
+            bid = self.current_bids.pop(cargo_id)
+            cargo = bid["cargo"]
+            if self.archive_path is not None:
+                row = (cargo_id, bid["amount"], bid["status"], bid["bid_date"],
+                       cargo["cargo_type"], cargo["origin"], cargo["destination"], cargo["total_value"])
+                self.archive_rows[cargo_id, bid["bid_date"]] = row
+                rows.append(row)
+            if bid["status"] == "Accepted":
+                totals["accepted"] += 1
+                totals["accepted_value"] += bid["amount"]
+            else:
+                totals["rejected"] += 1
+            self.changed_bids.add(cargo_id)
+
+        if self.journal is not None:
+            self.journal.write_many("unbid", ((cargo_id,) for cargo_id in archived))
+            self.journal.write_many("archive", rows)
+            self.log("archived", totals["accepted"], totals["rejected"], totals["accepted_value"])
+        return len(archived)
+
+    def set_save_path(self, path):
+        """Tie the game to the save file it is saved to or loaded from, with the bid archive next to it"""
+        self.save_path = path
+        self.archive_path = path + ARCHIVE_SUFFIX
+        if is_sqlite_path(path):
+            self.id_path = path
+
+    def player_data(self):
+        """The player values a save stores, as integers"""
+        return {
+            "credits": self.player_credits,
+            "game_date": self.today,
+            "archived_accepted": self.archived["accepted"],
+            "archived_rejected": self.archived["rejected"],
+            "archived_accepted_value": self.archived["accepted_value"]
+        }
+
+    @player_action
+    def advance_weeks(self, weeks=1):
+        """Play out several weeks in one go, returning every accepted bid
+
+        Each week resolves pending bids, moves the clock on, expires
+        listings past their deadline and posts that week's new cargo,
+        exactly as advancing and refreshing one week at a time would.
+        """
+        accepted = []
+        for _ in range(weeks):
+            accepted.extend(self.advance_time())
+            self.refresh_listings()
+        return accepted
+
+    @player_action
+    def resolve_pending_bids(self):
+        """Decide every pending bid, returning the accepted ones"""
+        accepted = []
+
+        for cargo_id in self.pending_bids:
+            bid_info = self.current_bids.get(cargo_id)
+            if bid_info is not None and bid_info["status"] == "Pending":
+                win_chance = self.win_chance(bid_info["amount"], bid_info["cargo"]["total_value"])
+
+                if self.bid_rng.random() < win_chance:
+                    bid_info["status"] = "Accepted"
+                    # The player pays the bid and is paid the cargo's value
+                    self.player_credits += bid_info["cargo"]["total_value"] - bid_info["amount"]
+
+                    # Remove the cargo from available listings
+                    cargo = self.get_cargo(cargo_id)
+                    if cargo:
+                        cargo["status"] = "Contracted"
+                        self.settled.add(cargo_id)
+                        self.log("status", cargo_id, "Contracted")
+
+                    accepted.append(bid_info)
+                    self.emit("bid_accepted", cargo_id, bid=bid_info)
+                else:
+                    bid_info["status"] = "Rejected"
+                    self.emit("bid_rejected", cargo_id, bid=bid_info)
+
+                self.changed_bids.add(cargo_id)
+                self.log_bid(cargo_id)
+
+        self.pending_bids.clear()
+        if accepted:
+            self.log("credits", self.player_credits)
+        return accepted
+
+    def save_game(self, path=SAVE_FILE):
+        """Write the market state to a save file (SQLite for .db paths, CSV otherwise)"""
+        snapshot = self.begin_save(path)
+        try:
+            save_snapshot(snapshot, path)
+        except Exception:
+            self.end_save(snapshot, False)
+            raise
+        self.end_save(snapshot)
+
+    def begin_save(self, path):
+        """Snapshot the market for save_snapshot() and journal later changes against path - finish with end_save()"""
+        snapshot = self.snapshot()
+
+        if self.journal is None or self.journal.save_path != path:
+            if self.journal is not None:
+                self.journal.close()
+            # A leftover journal for path belongs to some other game
+            discard_journal(path)
+            self.journal = Journal(path)
+        self.journal.begin_snapshot()
+
+        self.mark_synced(path if is_sqlite_path(path) else None)
+        self.set_save_path(path)
+        return snapshot
+
+    def end_save(self, snapshot, succeeded=True):
+        """Finish a save started with begin_save()"""
+        if succeeded:
+            self.journal.end_snapshot()
+        else:
+            # The next save has to write the failed save's changes again.
+            # The journal keeps them until a later save succeeds.
+            self.cargo.restore_changes(snapshot["cargo"])
+            self.changed_bids.update(snapshot["changed_bids"])
+            self.archive_rows = {**{(row[0], row[3]): row for row in snapshot["archive_rows"]}, **self.archive_rows}
+            self.synced_path = snapshot["synced_path"]
+
+    def snapshot(self):
+        """Copy everything a save needs, so it can be written on another thread"""
+        if self.partial:
+            raise ValueError("Only part of the save was loaded - it can't be saved back")
+
+        return {
+            "cargo": self.cargo.copy(),
+            "bids": {cargo_id: {"amount": bid["amount"], "status": bid["status"], "bid_date": bid["bid_date"]}
+                     for cargo_id, bid in self.current_bids.items()},
+            "changed_bids": set(self.changed_bids),
+            "archive_rows": list(self.archive_rows.values()),
+            "player": self.player_data(),
+            "synced_path": self.synced_path
+        }
+
+    def mark_synced(self, path):
+        """Forget pending changes once the state matches a save (path is None for CSV)"""
+        self.cargo.clear_changes()
+        self.changed_bids.clear()
+        self.archive_rows = {}
+        self.synced_path = path
+
+    def load_game(self, path=SAVE_FILE, statuses=None, recover=False):
+        """Replace the market state with a save file (only some statuses if given), replaying its journal if recover"""
+        load = self.begin_load(path, statuses, recover)
+        for section, record in read_save(path, statuses):
+            load.add(section, record)
+        self.finish_load(load)
+
+    def begin_load(self, path=SAVE_FILE, statuses=None, recover=False):
+        """Start loading a save file into a GameLoad, leaving the market as it is
+
+        Feed the GameLoad the records from read_save() - its store can be
+        shown while it fills up - and then pass it to finish_load().
+        """
+        return GameLoad(path, statuses, self.player_data(), recover)
+
+    def finish_load(self, load):
+        """Replace the market state with a completely read GameLoad"""
+        # Bids are resolved once all cargo is indexed, whatever order the sections came in
+        self.cargo = load.cargo
+        self.current_bids = resolve_bids(load.bid_rows, load.cargo)
+        self.player_credits = load.player["credits"]
+        self.today = load.player["game_date"]
+        # Saves from before bids were archived have no totals
+        self.archived = {"accepted": load.player.get("archived_accepted", 0),
+                         "rejected": load.player.get("archived_rejected", 0),
+                         "accepted_value": load.player.get("archived_accepted_value", 0)}
+        self.partial = load.statuses is not None
+        self.mark_synced(load.path if is_sqlite_path(load.path) else None)
+        self.record("load_game", load.path, sorted(load.statuses) if self.partial else None)
+
+        # The current session's unsaved changes are given up by loading
+        if self.journal is not None:
+            self.journal.close()
+            if not self.partial:
+                discard_journal(self.journal.save_path)
+            self.journal = None
+        if not self.partial:
+            # Only a recovery catches up with changes made after the save was written
+            if load.recover:
+                self.replay_journal(load.path)
+            else:
+                discard_journal(load.path)
+            self.journal = Journal(load.path)
+            self.set_save_path(load.path)
+
+        self.reindex()
+        self.pending_bids = {cargo_id: None for cargo_id, bid in self.current_bids.items()
+                             if bid["status"] == "Pending"}
+
+    def replay_journal(self, path):
+        """Apply the journal of a save file on top of the state loaded from it
+
+        Replayed changes count as unsaved, so the next save writes them.
+        """
+        store = self.cargo
+        for kind, values in read_journal(path):
+            if kind == "cargo":
+                store.add(parse_cargo_row(values))
+            elif kind == "drop":
+                self.drop_cargo(int(values[0]))
+            elif kind == "status":
+                cargo_id = int(values[0])
+                if cargo_id in store:
+                    store.set_field(cargo_id, "status", values[1])
+                    store.mark_changed(cargo_id)
+            elif kind == "bid":
+                cargo_id = int(values[0])
+                bid = self.current_bids.get(cargo_id)
+                if bid is None:
+                    cargo = store.get(cargo_id)
+                    if cargo is None:
+                        continue
+                    bid = self.current_bids[cargo_id] = {"cargo": cargo}
+                bid.update(amount=int(values[1]), status=values[2], bid_date=values[3])
+                self.changed_bids.add(cargo_id)
+            elif kind == "unbid":
+                if self.current_bids.pop(int(values[0]), None) is not None:
+                    self.changed_bids.add(int(values[0]))
+            elif kind == "archive":
+                row = parse_archive_row(values)
+                self.archive_rows[row[0], row[3]] = row
+            elif kind == "archived":
+                self.archived = dict(zip(("accepted", "rejected", "accepted_value"), map(int, values)))
+            elif kind == "date":
+                self.today = int(values[0])
+            elif kind == "credits":
+                self.player_credits = int(values[0])
+
+
+class GameLoad:
+    """Market state read from a save file, filled one record at a time"""
+
+    def __init__(self, path, statuses, player, recover=False):
+        self.path = path
+        self.statuses = statuses
+        self.recover = recover
+        self.cargo = CargoStore()
+        self.bid_rows = []
+        # Player values the save doesn't have are kept from the current game
+        self.player = dict(player)
+
+    def add(self, section, record):
+        """Take one (section, record) pair from read_save()"""
+        if section == "cargo":
+            self.cargo.add(record)
+        elif section == "bids":
+            self.bid_rows.append(record)
+        else:
+            self.player.update(record)
+
+
+def save_snapshot(snapshot, path, progress=None):
+    """Write a CargoMarket.snapshot() to a save file - safe to call from a worker thread
+
+    progress, if given, is called with (cargo rows written, total rows).
+    """
+    store = snapshot["cargo"]
+    if is_sqlite_path(path):
+        # Only upsert what changed since the last save to the same SQLite file. Any other
+        # file gets every listing, next to the listings the cargo editor added to it
+        full = snapshot["synced_path"] != path
+        with SqliteSave(path) as save:
+            with save.conn:
+                save.write_cargo(store, full, progress)
+                save.write_bids(snapshot["bids"], snapshot["changed_bids"], full)
+                save.write_player(snapshot["player"])
+    else:
+        write_csv_save(path, store, snapshot["bids"], snapshot["player"], progress)
+
+    # Only once the save is written, so a failed save can write its archived bids again
+    if snapshot["archive_rows"]:
+        append_bid_archive(path + ARCHIVE_SUFFIX, snapshot["archive_rows"])
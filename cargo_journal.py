@@ -0,0 +1,91 @@
+import csv
+import os
+
+# A save's journal lives next to it as <save file> + JOURNAL_SUFFIX
+JOURNAL_SUFFIX = ".journal"
+
+# Entries already covered by a snapshot that is still being written
+OLD_SUFFIX = ".old"
+
+
+def journal_path(save_path):
+    """Path of the journal that belongs to a save file"""
+    return save_path + JOURNAL_SUFFIX
+
+
+def has_journal(save_path):
+    """Whether a save file has journal entries that aren't in the save itself"""
+    path = journal_path(save_path)
+    return any(os.path.exists(p) and os.path.getsize(p) > 0 for p in (path + OLD_SUFFIX, path))
+
+
+def discard_journal(save_path):
+    """Delete a save file's journal, e.g. when its changes aren't wanted"""
+    path = journal_path(save_path)
+    for p in (path + OLD_SUFFIX, path):
+        if os.path.exists(p):
+            os.remove(p)
+
+
+def read_journal(save_path):
+    """Yield a save's journal entries as (kind, values) in the order they were written
+
+    Entries from an unfinished snapshot's old journal come first. Reading
+    stops at a torn last line left by a crash mid-append, so only whole
+    entries are returned.
+    """
+    path = journal_path(save_path)
+    for p in (path + OLD_SUFFIX, path):
+        if not os.path.exists(p):
+            continue
+        with open(p, "r", newline="") as file:
+            for line in file:
+                # Every complete entry ends with a newline
+                if not line.endswith("\n"):
+                    return
+                row = next(csv.reader([line]), None)
+                if row:
+                    yield row[0], row[1:]
+
+
+class Journal:
+    """Append-only log of market changes made since the last snapshot of a save"""
+
+    def __init__(self, save_path):
+        self.save_path = save_path
+        self.path = journal_path(save_path)
+        self.file = open(self.path, "a", newline="")
+        self.writer = csv.writer(self.file)
+
+    def close(self):
+        self.file.close()
+
+    def write(self, kind, *values):
+        """Append one entry"""
+        self.writer.writerow((kind,) + values)
+        self.file.flush()
+
+    def write_many(self, kind, rows):
+        """Append one entry per row of values, with a single flush"""
+        self.writer.writerows((kind,) + tuple(row) for row in rows)
+        self.file.flush()
+
+    def begin_snapshot(self):
+        """Set the current entries aside before a snapshot of the save is written"""
+        self.file.close()
+        old_path = self.path + OLD_SUFFIX
+        if os.path.exists(old_path):
+            # An earlier snapshot never finished - its entries are still needed
+            with open(self.path, "rb") as source, open(old_path, "ab") as target:
+                target.write(source.read())
+            os.remove(self.path)
+        elif os.path.exists(self.path):
+            os.replace(self.path, old_path)
+        self.file = open(self.path, "a", newline="")
+        self.writer = csv.writer(self.file)
+
+    def end_snapshot(self):
+        """Drop the entries set aside once the snapshot is safely written"""
+        old_path = self.path + OLD_SUFFIX
+        if os.path.exists(old_path):
+            os.remove(old_path)
@@ -0,0 +1,185 @@
+import argparse
+import math
+import multiprocessing
+import os
+import time
+from array import array
+from datetime import date
+
+from cargo_config import load_config, compile_config
+from cargo_engine import CargoMarket, derive_seed
+
+# Campaigns handed to a worker process at a time - large enough that passing
+# results between processes costs little next to running the campaigns
+CHUNK_RUNS = 25
+
+# Outcomes recorded for every campaign
+METRICS = ("credits", "profit", "contracts_won", "bids_placed", "win_rate")
+
+# Percentiles reported for each outcome
+PERCENTILES = (5, 25, 50, 75, 95)
+
+# Compiled config of a worker process, set once when the worker starts
+_worker_config = None
+
+
+def campaign_seed(seed, run):
+    """Market seed of one campaign, so every run has its own random streams"""
+    return derive_seed(seed, f"campaign/{run}")
+
+
+def run_campaign(config, seed, weeks, bids_per_week, bid_fraction, start_date):
+    """Play one headless campaign and return its outcome as a tuple in METRICS order
+
+    Each week the player bids bid_fraction of the value on up to
+    bids_per_week open listings they can still afford, then time advances
+    (no bids are placed if bid_fraction is below the market's minimum bid).
+    The market charges the bid and pays out the cargo's value for every
+    won contract.
+    """
+    market = CargoMarket(config, seed=seed, start_date=start_date)
+    market.generate_cargo(config.settings["initial_cargo_listings"])
+
+    starting_credits = market.player_credits
+    bids_placed = 0
+    contracts_won = 0
+
+    for _ in range(weeks):
+        placed = 0
+        available = market.available_credits()
+        for cargo in market.available_cargo():
+            if placed == bids_per_week:
+                break
+            amount = int(cargo["total_value"] * bid_fraction)
+            if (cargo["id"] in market.current_bids or amount > available or
+                    amount < market.minimum_bid(cargo["total_value"])):
+                continue
+            market.place_bid(cargo["id"], amount)
+            available -= amount
+            placed += 1
+        bids_placed += placed
+
+        contracts_won += len(market.advance_time())
+        market.refresh_listings()
+
+    credits = market.player_credits
+    win_rate = contracts_won / bids_placed if bids_placed else 0.0
+    return credits, credits - starting_credits, contracts_won, bids_placed, win_rate
+
+
+def init_worker(config):
+    """Keep the compiled config in the worker, so it is only sent over once"""
+    global _worker_config
+    _worker_config = config
+
+
+def run_campaigns(config, seed, first_run, count, weeks, bids_per_week, bid_fraction, start_date):
+    """Run campaigns first_run to first_run + count and return their outcomes as arrays"""
+    results = [array("d") for _ in METRICS]
+    for run in range(first_run, first_run + count):
+        outcome = run_campaign(config, campaign_seed(seed, run), weeks,
+                               bids_per_week, bid_fraction, start_date)
+        for values, value in zip(results, outcome):
+            values.append(value)
+    return results
+
+
+def run_chunk(task):
+    """Run a chunk of campaigns in a worker"""
+    return run_campaigns(_worker_config, *task)
+
+
+class RunningStats:
+    """Mean, spread and percentiles of a stream of values
+
+    Values are folded in as they arrive (Welford's method) and otherwise
+    only kept in a compact array for the percentiles.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.values = array("d")
+
+    def add_many(self, values):
+        for value in values:
+            self.count += 1
+            delta = value - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (value - self.mean)
+        self.values.extend(values)
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def percentiles(self, points=PERCENTILES):
+        """Values at the given percentiles (nearest rank)"""
+        ordered = sorted(self.values)
+        if not ordered:
+            return [0.0 for _ in points]
+        return [ordered[min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))]
+                for p in points]
+
+
+def simulate(config, runs, weeks=52, bids_per_week=5, bid_fraction=0.85, seed=0,
+             workers=None, start_date=None, progress=None):
+    """Run independent campaigns across a process pool and return {metric: RunningStats}
+
+    Campaign i always gets the market seed campaign_seed(seed, i), and
+    chunks are aggregated in run order, so the results depend only on the
+    arguments - not on the number of workers. progress(done, runs) is
+    called as chunks finish.
+    """
+    config = compile_config(config)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if start_date is None:
+        start_date = date.today().toordinal()
+
+    tasks = [(seed, first, min(CHUNK_RUNS, runs - first), weeks, bids_per_week, bid_fraction, start_date)
+             for first in range(0, runs, CHUNK_RUNS)]
+    stats = {metric: RunningStats() for metric in METRICS}
+
+    def collect(results):
+        done = 0
+        for chunk in results:
+            for metric, values in zip(METRICS, chunk):
+                stats[metric].add_many(values)
+            done += len(chunk[0])
+            if progress:
+                progress(done, runs)
+
+    if workers <= 1:
+        init_worker(config)
+        collect(map(run_chunk, tasks))
+    else:
+        with multiprocessing.Pool(workers, initializer=init_worker, initargs=(config,)) as pool:
+            collect(pool.imap(run_chunk, tasks))
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Estimate campaign outcomes over many independent runs")
+    parser.add_argument("--runs", type=int, default=1000, help="number of campaigns")
+    parser.add_argument("--weeks", type=int, default=52, help="weeks per campaign")
+    parser.add_argument("--bids-per-week", type=int, default=5, help="most bids placed each week")
+    parser.add_argument("--bid-fraction", type=float, default=0.85, help="bid as a fraction of cargo value")
+    parser.add_argument("--seed", type=int, default=0, help="seed all campaign seeds are derived from")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--config", default=None, help="config file (default: cargo_config.json)")
+    args = parser.parse_args()
+
+    config = load_config(args.config) if args.config else load_config()
+    start = time.perf_counter()
+    stats = simulate(config, args.runs, args.weeks, args.bids_per_week, args.bid_fraction,
+                     args.seed, args.workers)
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.runs:,} campaigns of {args.weeks} weeks in {elapsed:.2f}s")
+    print(f"{'':>14}{'mean':>14}{'std':>14}" + "".join(f"{f'p{p}':>14}" for p in PERCENTILES))
+    for metric in METRICS:
+        s = stats[metric]
+        print(f"{metric:>14}{s.mean:>14,.2f}{s.std:>14,.2f}" +
+              "".join(f"{value:>14,.2f}" for value in s.percentiles()))
@@ -0,0 +1,214 @@
+from cargo_store import date_to_ordinal
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional - the planner falls back to plain Python
+    np = None
+
+# Most penalty steps tried when the credit budget rules out the best cargo for the hold
+BUDGET_STEPS = 8
+
+# Stop trying penalties once a selection is within this share of the best possible profit
+BUDGET_TOLERANCE = 0.001
+
+# Most search steps a route plan may take, shared between the route lengths tried
+ROUTE_SEARCH_NODES = 20000
+
+
+def knapsack(masses, profits, capacity):
+    """Indexes of the items with the most total profit whose masses fit in capacity"""
+    # best[c] is the most profit that fits in c tons so far; take[i][c] says whether item i is in it
+    count = len(masses)
+    if np is not None:
+        best = np.zeros(capacity + 1)
+        take = np.zeros((count, capacity + 1), dtype=bool)
+        for index, (mass, profit) in enumerate(zip(masses, profits)):
+            if mass > capacity:
+                continue
+            candidate = best[:capacity + 1 - mass] + profit
+            rest = best[mass:]
+            take[index, mass:] = candidate > rest
+            np.maximum(rest, candidate, out=rest)
+    else:
+        best = [0.0] * (capacity + 1)
+        take = []
+        for mass, profit in zip(masses, profits):
+            taken = [False] * (capacity + 1)
+            for c in range(capacity, mass - 1, -1):
+                candidate = best[c - mass] + profit
+                if candidate > best[c]:
+                    best[c] = candidate
+                    taken[c] = True
+            take.append(taken)
+
+    chosen = []
+    c = capacity
+    for index in range(count - 1, -1, -1):
+        if take[index][c]:
+            chosen.append(index)
+            c -= masses[index]
+    chosen.reverse()
+    return chosen
+
+
+def plan_hold(cargo_list, advisor, hold_tons, budget, origin, deadline_after=None):
+    """Pick the listings at origin that fill a hold within budget for the most expected profit"""
+    # Listings due before deadline_after (an ISO date) are left out. Every bid counts
+    # against the budget and the hold must fit every listing in case all bids win
+    deadline = date_to_ordinal(deadline_after) if deadline_after else None
+    items = []
+    for cargo in cargo_list:
+        if cargo["status"] != "Available" or cargo["origin"] != origin or cargo["mass"] > hold_tons:
+            continue
+        if deadline is not None and date_to_ordinal(cargo["deadline"]) < deadline:
+            continue
+        bid, _, expected = advisor.advise(cargo["total_value"])
+        if expected > 0 and bid <= budget:
+            items.append((cargo, cargo["mass"], bid, expected))
+
+    masses = [item[1] for item in items]
+    bids = [item[2] for item in items]
+    profits = [item[3] for item in items]
+
+    def totals(chosen):
+        return sum(bids[i] for i in chosen), sum(profits[i] for i in chosen)
+
+    chosen = knapsack(masses, profits, hold_tons)
+    cost, bound = totals(chosen)
+    if cost > budget:
+        # Lagrangian relaxation: penalize every credit bid and keep the best selection within
+        # budget. "bound" ends up as the most profit any selection could reach
+        best, best_profit = [], 0.0
+        low, high = 0.0, max(profits[i] / bids[i] for i in range(len(items)))
+        for _ in range(BUDGET_STEPS):
+            penalty = (low + high) / 2
+            adjusted = [profit - penalty * bid for profit, bid in zip(profits, bids)]
+            candidates = [i for i, value in enumerate(adjusted) if value > 0]
+            selection = [candidates[i] for i in knapsack([masses[i] for i in candidates],
+                                                         [adjusted[i] for i in candidates], hold_tons)]
+            # No selection within budget can beat the penalized optimum plus the penalty on the budget
+            bound = min(bound, sum(adjusted[i] for i in selection) + penalty * budget)
+            cost, profit = totals(selection)
+            if cost <= budget:
+                high = penalty
+                if profit > best_profit:
+                    best, best_profit = selection, profit
+            else:
+                low = penalty
+            if best_profit >= bound * (1 - BUDGET_TOLERANCE):
+                break
+
+        # Top up with whatever still fits, most profit per credit first
+        chosen = best
+        mass, cost = sum(masses[i] for i in chosen), totals(chosen)[0]
+        taken = set(chosen)
+        for i in sorted(range(len(items)), key=lambda i: profits[i] / bids[i], reverse=True):
+            if i not in taken and mass + masses[i] <= hold_tons and cost + bids[i] <= budget:
+                chosen.append(i)
+                mass += masses[i]
+                cost += bids[i]
+
+    cost, profit = totals(chosen)
+    return {
+        "cargo": [items[i][0] for i in chosen],
+        "mass": sum(masses[i] for i in chosen),
+        "bids": cost,
+        "expected_profit": profit,
+        "bound": max(bound, profit)
+    }
+
+
+def plan_route(cargo_list, advisor, start, today, max_weeks, hold_tons=None):
+    """Find the chain of contracts from start with the most expected profit per week"""
+    # Contracts by (origin, destination), most profitable first, as (profit, deadline, cargo)
+    pairs = {}
+    for cargo in cargo_list:
+        if cargo["status"] != "Available" or (hold_tons is not None and cargo["mass"] > hold_tons):
+            continue
+        expected = advisor.advise(cargo["total_value"])[2]
+        if expected > 0:
+            pairs.setdefault((cargo["origin"], cargo["destination"]), []).append(
+                (expected, date_to_ordinal(cargo["deadline"]), cargo))
+    for contracts in pairs.values():
+        contracts.sort(key=lambda contract: contract[0], reverse=True)
+
+    worlds = sorted({start} | {world for pair in pairs for world in pair})
+    routes = {origin: [] for origin in worlds}
+    for origin, destination in pairs:
+        routes[origin].append(destination)
+
+    # A jump takes a week, so a contract picked up in week t is delivered at its end.
+    # Weeks after the last deadline could only add empty legs
+    def deliverable(week):
+        return today + 7 * (week + 1)
+    last_deadline = max((deadline for contracts in pairs.values() for _, deadline, _ in contracts), default=today)
+    max_weeks = min(max_weeks, (last_deadline - today) // 7)
+
+    # Most profit of one leg on each pair in each week, ignoring which contracts are used up
+    leg_profit = [{pair: next((expected for expected, deadline, _ in contracts if deadline >= deliverable(week)), 0.0)
+                   for pair, contracts in pairs.items()}
+                  for week in range(max_weeks)]
+
+    best = {"legs": [], "profit": 0.0, "weeks": 0, "profit_per_week": 0.0, "complete": True}
+    nodes_left = ROUTE_SEARCH_NODES
+    for weeks in range(1, max_weeks + 1):
+        # reachable[t][world] - most profit from being at world at the start of week t. It
+        # ignores used contracts, so it is an upper bound for the search below
+        reachable = [None] * weeks + [dict.fromkeys(worlds, 0.0)]
+        for week in range(weeks - 1, -1, -1):
+            after = reachable[week + 1]
+            # Waiting or jumping empty leads to the best world to be at next week
+            empty = max(after.values())
+            reachable[week] = {world: max([empty] + [leg_profit[week][(world, destination)] + after[destination]
+                                                      for destination in routes[world]])
+                               for world in worlds}
+        if reachable[0][start] / weeks <= best["profit_per_week"]:
+            continue
+
+        # Share the search budget between the lengths still to come
+        found = {"profit": best["profit_per_week"] * weeks, "legs": None,
+                 "nodes": nodes_left // (max_weeks - weeks + 1)}
+        nodes_left -= found["nodes"]
+        used = set()
+        legs = []
+
+        def search(world, week, profit):
+            if week == weeks:
+                if profit > found["profit"]:
+                    found["profit"], found["legs"] = profit, list(legs)
+                return
+            if profit + reachable[week][world] <= found["profit"]:
+                return
+            # Near-tied routes can't be told apart by the bound, so the search is capped
+            if found["nodes"] <= 0:
+                best["complete"] = False
+                return
+            found["nodes"] -= 1
+
+            # The best unused contract to each destination, or wait (target is world) or jump empty
+            after = reachable[week + 1]
+            moves = []
+            for destination in routes[world]:
+                for expected, deadline, cargo in pairs[(world, destination)]:
+                    if deadline >= deliverable(week) and cargo["id"] not in used:
+                        moves.append((expected + after[destination], expected, destination, cargo))
+                        break
+            moves.extend((after[target], 0.0, target, None) for target in worlds)
+
+            # Most promising moves first, so good routes are found early and prune the rest
+            moves.sort(key=lambda move: move[0], reverse=True)
+            for _, gain, destination, cargo in moves:
+                if cargo is not None:
+                    used.add(cargo["id"])
+                legs.append((week, world, destination, cargo))
+                search(destination, week + 1, profit + gain)
+                legs.pop()
+                if cargo is not None:
+                    used.discard(cargo["id"])
+
+        search(start, 0, 0.0)
+        nodes_left += found["nodes"]
+        if found["legs"] is not None:
+            best.update(legs=found["legs"], profit=found["profit"], weeks=weeks,
+                        profit_per_week=found["profit"] / weeks)
+    return best
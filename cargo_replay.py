@@ -0,0 +1,62 @@
+import argparse
+import json
+import time
+
+from cargo_engine import CargoMarket, np
+
+# Market methods an action log may call. None of them touch files, so a replay
+# never journals or archives - loading a save is recorded but can't be replayed,
+# since the save and its journal have moved on since
+ACTIONS = ("generate_cargo", "refresh_listings", "place_bid", "advance_time", "advance_weeks",
+           "resolve_pending_bids", "archive_bids", "set_config", "set_weight", "skip_ids")
+
+
+def write_action_log(market, path):
+    """Write a market's action log to a JSON file"""
+    with open(path, "w") as f:
+        json.dump(market.action_log(), f)
+
+
+def read_action_log(path):
+    """Read an action log written by write_action_log"""
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def replay(log):
+    """Build a new market by replaying an action log, and return it
+
+    The result matches the recorded market exactly as long as it is
+    replayed with the same NumPy availability. Replays run headless at
+    full speed.
+    """
+    if log["numpy"] != (np is not None):
+        raise ValueError("The log was recorded " + ("with" if log["numpy"] else "without") +
+                         " NumPy, so it can't be replayed exactly here")
+    for name, *_ in log["actions"]:
+        if name == "load_game":
+            raise ValueError("The log loads a saved game, so it can't be replayed")
+        if name not in ACTIONS:
+            raise ValueError(f"Unknown action in log: {name}")
+
+    market = CargoMarket(log["config"], seed=log["seed"], start_date=log["start_date"])
+    for name, *args in log["actions"]:
+        getattr(market, name)(*args)
+    return market
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a recorded cargo market headlessly")
+    parser.add_argument("log", help="action log written by write_action_log")
+    parser.add_argument("--expect", help="state digest the replay has to end with")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    log = read_action_log(args.log)
+    market = replay(log)
+    elapsed = time.perf_counter() - start
+
+    digest = market.state_digest()
+    print(f"Replayed {len(log['actions']):,} actions in {elapsed:.2f}s - state {digest}")
+    if args.expect and args.expect != digest:
+        raise SystemExit(f"State differs from the expected {args.expect}")
@@ -0,0 +1,114 @@
+import random
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional - only sample_array() uses it
+    np = None
+
+
+class AliasTable:
+    """Weighted sampling of indexes in O(1) per draw (Vose's alias method)"""
+
+    def __init__(self, weights):
+        self.weights = array("d")
+        for weight in weights:
+            self.weights.append(self.check_weight(weight))
+        if not self.weights or sum(self.weights) <= 0:
+            raise ValueError("Weights must include at least one positive weight")
+        self.rebuild()
+
+    def __len__(self):
+        return len(self.weights)
+
+    @staticmethod
+    def check_weight(weight):
+        weight = float(weight)
+        if not weight >= 0:
+            raise ValueError(f"Weight must be a non-negative number, not {weight}")
+        return weight
+
+    def rebuild(self, headroom=None):
+        """Rebuild the alias table over the current weights
+
+        headroom optionally maps an index to a capacity above its weight.
+        """
+        caps = array("d", self.weights)
+        for index, cap in (headroom or {}).items():
+            caps[index] = cap
+        count = len(caps)
+        cap_total = sum(caps)
+
+        # Split entries into under- and over-full slots of the average size
+        scaled = [cap * count / cap_total for cap in caps]
+        prob = array("d", [1.0]) * count
+        alias = array("q", range(count))
+        small = [i for i, value in enumerate(scaled) if value < 1.0]
+        large = [i for i, value in enumerate(scaled) if value >= 1.0]
+
+        # Top up each under-full slot with part of an over-full one
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            prob[less] = scaled[less]
+            alias[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            (small if scaled[more] < 1.0 else large).append(more)
+
+        self.caps = caps
+        self.prob = prob
+        self.alias = alias
+        self.cap_total = cap_total
+        self.weight_total = sum(self.weights)
+
+        # The same tables as NumPy arrays for vectorized draws
+        if np is not None:
+            self.np_tables = (np.array(prob, dtype=np.float64), np.array(alias, dtype=np.int64),
+                              np.array(caps, dtype=np.float64), np.array(self.weights, dtype=np.float64))
+        else:
+            self.np_tables = None
+
+    def set_weight(self, index, weight):
+        """Change the weight of one entry, without a rebuild while it fits its capacity"""
+        weight = self.check_weight(weight)
+        weight_total = self.weight_total - self.weights[index] + weight
+        if weight_total <= 0:
+            raise ValueError("Weights must include at least one positive weight")
+
+        self.weights[index] = weight
+        self.weight_total = weight_total
+
+        # Draws are kept with probability weight / capacity, so a weight only needs a rebuild once it
+        # outgrows its capacity, or once the weights are below half the capacities (over two tries a draw)
+        if weight > self.caps[index]:
+            self.rebuild({index: 2 * weight})
+        elif weight_total * 2 < self.cap_total:
+            self.rebuild()
+        elif self.np_tables is not None:
+            self.np_tables[3][index] = weight
+
+    def sample(self, rng=random):
+        """Draw one index with probability proportional to its weight"""
+        count = len(self.prob)
+        prob, alias, caps, weights = self.prob, self.alias, self.caps, self.weights
+        while True:
+            index = rng.randrange(count)
+            if rng.random() >= prob[index]:
+                index = alias[index]
+            weight = weights[index]
+            if weight == caps[index] > 0 or rng.random() * caps[index] < weight:
+                return index
+
+    def sample_array(self, rng, count):
+        """Draw count indexes at once with a NumPy Generator"""
+        prob, alias, caps, weights = self.np_tables
+        result = np.empty(count, dtype=np.int64)
+        pending = np.arange(count)
+        while pending.size:
+            index = rng.integers(0, len(prob), pending.size)
+            index = np.where(rng.random(pending.size) < prob[index], index, alias[index])
+            # Keep each draw with probability weight / capacity and redraw the rest
+            kept = rng.random(pending.size) * caps[index] < weights[index]
+            result[pending[kept]] = index[kept]
+            pending = pending[~kept]
+        return result
@@ -0,0 +1,351 @@
+import csv
+import os
+import sqlite3
+from itertools import islice
+
+from cargo_store import CARGO_FIELDS, date_to_ordinal, ordinal_to_date
+
+BID_FIELDS = ["cargo_id", "amount", "status", "bid_date"]
+
+# Resolved bids moved out of the game are appended to <save file> + ARCHIVE_SUFFIX
+ARCHIVE_SUFFIX = ".archive.csv"
+ARCHIVE_FIELDS = ["cargo_id", "amount", "status", "bid_date", "cargo_type", "origin", "destination",
+                  "total_value"]
+
+SAVE_FILE = "cargo_sim_save.csv"
+
+# Save files with these extensions use the SQLite backend instead of CSV
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+# Rows written between progress reports
+PROGRESS_ROWS = 10000
+
+# Section markers of the CSV save file, in the order they are written
+CSV_SECTIONS = {"CARGO_DATA": "cargo", "BID_DATA": "bids", "PLAYER_DATA": "player"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cargo (
+    id INTEGER PRIMARY KEY,
+    cargo_type TEXT NOT NULL,
+    origin TEXT NOT NULL,
+    destination TEXT NOT NULL,
+    mass INTEGER NOT NULL,
+    value_per_ton INTEGER NOT NULL,
+    total_value INTEGER NOT NULL,
+    shipping_company TEXT NOT NULL,
+    posted_on TEXT NOT NULL,
+    deadline TEXT NOT NULL,
+    status TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS bids (
+    cargo_id INTEGER PRIMARY KEY,
+    amount INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    bid_date TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS player (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+def is_sqlite_path(path):
+    """Whether a save file path should use the SQLite backend"""
+    return str(path).lower().endswith(SQLITE_SUFFIXES)
+
+
+def parse_cargo_row(row):
+    """Convert a CARGO_DATA row from the save file into a cargo dict"""
+    return {
+        "id": int(row[0]),
+        "cargo_type": row[1],
+        "origin": row[2],
+        "destination": row[3],
+        "mass": int(row[4]),
+        "value_per_ton": int(row[5]),
+        "total_value": int(row[6]),
+        "shipping_company": row[7],
+        "posted_on": row[8],
+        "deadline": row[9],
+        "status": row[10]
+    }
+
+
+def read_csv_save(path, sections=("cargo", "bids", "player"), statuses=None):
+    """Stream a sectioned CSV save file, yielding (section, record) pairs
+
+    Rows are parsed one at a time, so memory use doesn't depend on the size
+    of the file. Only the requested sections are parsed, and reading stops
+    as soon as all of them have been read. If statuses is given, only cargo
+    with one of those statuses is yielded (e.g. {"Available"}).
+
+    Records are cargo dicts for "cargo", dicts keyed like BID_FIELDS for
+    "bids" and a dict of integer player values for "player" - "credits",
+    "game_date" as a day ordinal and the archived bid totals (older saves
+    only have some of them).
+    """
+    remaining = set(sections)
+
+    with open(path, "r", newline="") as file:
+        section = None
+        header = False
+        player_fields = []
+
+        for row in csv.reader(file):
+            if not row:
+                continue
+
+            if row[0] in CSV_SECTIONS:
+                remaining.discard(section)
+                if not remaining:
+                    return
+                section = CSV_SECTIONS[row[0]]
+                header = True
+                continue
+
+            # The first row of each section holds the column names
+            if header:
+                header = False
+                if section == "player":
+                    player_fields = row
+                continue
+
+            if section not in remaining:
+                continue
+
+            if section == "cargo":
+                if statuses is None or row[10] in statuses:
+                    yield section, parse_cargo_row(row)
+            elif section == "bids":
+                yield section, {"cargo_id": int(row[0]), "amount": int(row[1]),
+                                "status": row[2], "bid_date": row[3]}
+            elif section == "player":
+                player = {}
+                for field, value in zip(player_fields, row):
+                    if value:
+                        player[field] = date_to_ordinal(value) if field == "game_date" else int(value)
+                yield section, player
+
+
+def write_rows(write, rows, total, progress=None):
+    """Pass rows to write(rows) in chunks, calling progress(done, total) after each"""
+    done = 0
+    while True:
+        chunk = list(islice(rows, PROGRESS_ROWS))
+        if not chunk:
+            break
+        write(chunk)
+        done += len(chunk)
+        if progress:
+            progress(done, total)
+
+
+def read_save(path, statuses=None):
+    """Stream any save file as (section, record) pairs, like read_csv_save"""
+    if not is_sqlite_path(path):
+        yield from read_csv_save(path, statuses=statuses)
+        return
+
+    with SqliteSave(path) as save:
+        for cargo in save.read_cargo(statuses):
+            yield "cargo", cargo
+        for bid in save.read_bids():
+            yield "bids", bid
+        player = save.read_player()
+        if player:
+            yield "player", player
+
+
+def write_csv_save(path, cargo_list, bids, player, progress=None):
+    """Write a complete sectioned CSV save file from a CargoStore
+
+    player is a dict of integer player values like read_csv_save returns
+    (at least "credits"; "game_date" is a day ordinal). The file is written
+    next to the old one and then moved over it, so a save that fails part
+    way leaves the previous save intact. progress, if given, is called with
+    (rows written, total rows) as cargo is written.
+    """
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", newline="") as file:
+        writer = csv.writer(file)
+
+        # Write cargo data
+        writer.writerow(["CARGO_DATA"])
+        writer.writerow(CARGO_FIELDS)
+        write_rows(writer.writerows, cargo_list.rows(), len(cargo_list), progress)
+
+        # Write bid data
+        writer.writerow(["BID_DATA"])
+        writer.writerow(BID_FIELDS)
+        for cargo_id, bid_info in bids.items():
+            writer.writerow([
+                cargo_id,
+                bid_info["amount"],
+                bid_info["status"],
+                bid_info["bid_date"]
+            ])
+
+        # Write player data
+        writer.writerow(["PLAYER_DATA"])
+        writer.writerow(list(player))
+        writer.writerow([ordinal_to_date(value) if field == "game_date" else value
+                         for field, value in player.items()])
+
+    os.replace(temp_path, path)
+
+
+def append_bid_archive(path, rows):
+    """Append archived bids (tuples in ARCHIVE_FIELDS order) to an archive CSV file"""
+    new_file = not os.path.exists(path)
+    with open(path, "a", newline="") as file:
+        writer = csv.writer(file)
+        if new_file:
+            writer.writerow(ARCHIVE_FIELDS)
+        writer.writerows(rows)
+
+
+def read_bid_archive(path):
+    """Stream archived bids as dicts keyed like ARCHIVE_FIELDS"""
+    with open(path, "r", newline="") as file:
+        reader = csv.reader(file)
+        next(reader, None)
+        for row in reader:
+            yield dict(zip(ARCHIVE_FIELDS, parse_archive_row(row)))
+
+
+def parse_archive_row(row):
+    """Turn an archive row of strings back into a tuple in ARCHIVE_FIELDS order"""
+    return tuple(int(value) if field in ("cargo_id", "amount", "total_value") else value
+                 for field, value in zip(ARCHIVE_FIELDS, row))
+
+
+def resolve_bids(bid_rows, store):
+    """Attach bid rows to their cargo through the store's ID index
+
+    Returns the cargo ID -> bid dict mapping used by the engine. Bids whose
+    cargo isn't in the store are dropped.
+    """
+    current_bids = {}
+    for row in bid_rows:
+        cargo = store.get(row["cargo_id"])
+        if cargo:
+            current_bids[row["cargo_id"]] = {
+                "amount": row["amount"],
+                "status": row["status"],
+                "bid_date": row["bid_date"],
+                "cargo": cargo
+            }
+    return current_bids
+
+
+class SqliteSave:
+    """SQLite save file with separate cargo, bid and player tables
+
+    Writes are upserts of individual rows, so a save only has to touch the
+    rows that changed since the last one. The simulator and the cargo
+    editor can share one file: each of them only writes the tables and
+    rows it actually changed, and takes new cargo IDs from reserve_ids().
+    Use the connection as a context manager to group several writes into
+    one transaction.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30)
+        # WAL lets the editor read while the simulator is writing
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write_cargo(self, store, full=False, progress=None):
+        """Write a CargoStore - every listing if full, otherwise only its changes
+
+        Removed listings are deleted either way, and listings other writers
+        added to the file are left alone. progress, if given, is called with
+        (rows written, total rows).
+        """
+        placeholders = ", ".join("?" * len(CARGO_FIELDS))
+        insert = f"INSERT OR REPLACE INTO cargo ({', '.join(CARGO_FIELDS)}) VALUES ({placeholders})"
+
+        self.conn.executemany("DELETE FROM cargo WHERE id = ?", ((cargo_id,) for cargo_id in store.removed))
+        if full:
+            rows = store.rows()
+            total = len(store)
+        else:
+            records = store.changed_records()
+            rows = store.rows(records)
+            total = len(records)
+
+        write_rows(lambda chunk: self.conn.executemany(insert, chunk), rows, total, progress)
+
+    def reserve_ids(self, count, first_id=1):
+        """Reserve count new cargo IDs and return the first - no other writer of the file gets them
+
+        They come after every listing in the file and every ID reserved
+        before, and start at first_id or later.
+        """
+        with self.conn:
+            # Take the write lock before reading, so two writers can't reserve the same IDs
+            self.conn.execute("BEGIN IMMEDIATE")
+            saved = self.conn.execute("SELECT MAX(id) FROM cargo").fetchone()[0] or 0
+            reserved = self.conn.execute("SELECT value FROM counters WHERE name = 'cargo_id'").fetchone()
+            first_id = max(first_id, saved + 1, reserved[0] if reserved else 1)
+            self.conn.execute("INSERT OR REPLACE INTO counters (name, value) VALUES ('cargo_id', ?)",
+                              (first_id + count,))
+        return first_id
+
+    def write_bids(self, bids, changed_ids=None, full=False):
+        """Write bids (cargo ID -> bid dict) - all of them if full, otherwise only changed_ids
+
+        Changed IDs that are no longer in bids (e.g. archived) are deleted.
+        """
+        insert = "INSERT OR REPLACE INTO bids (cargo_id, amount, status, bid_date) VALUES (?, ?, ?, ?)"
+
+        if full:
+            self.conn.execute("DELETE FROM bids")
+            cargo_ids = bids.keys()
+        else:
+            cargo_ids = [cargo_id for cargo_id in changed_ids if cargo_id in bids]
+            self.conn.executemany("DELETE FROM bids WHERE cargo_id = ?",
+                                  ((cargo_id,) for cargo_id in changed_ids if cargo_id not in bids))
+
+        self.conn.executemany(insert, (
+            (cargo_id, bids[cargo_id]["amount"], bids[cargo_id]["status"], bids[cargo_id]["bid_date"])
+            for cargo_id in cargo_ids
+        ))
+
+    def write_player(self, player):
+        """Write a dict of integer player values (credits, game date ordinal, ...)"""
+        self.conn.executemany("INSERT OR REPLACE INTO player (key, value) VALUES (?, ?)", player.items())
+
+    def read_cargo(self, statuses=None):
+        """Stream saved listings as cargo dicts in ID order, optionally only some statuses"""
+        query = f"SELECT {', '.join(CARGO_FIELDS)} FROM cargo"
+        params = []
+        if statuses is not None:
+            params = list(statuses)
+            query += f" WHERE status IN ({', '.join('?' * len(params))})"
+        for row in self.conn.execute(query + " ORDER BY id", params):
+            yield dict(zip(CARGO_FIELDS, row))
+
+    def read_bids(self):
+        """Stream saved bids as dicts keyed like the bid table columns"""
+        for row in self.conn.execute(f"SELECT {', '.join(BID_FIELDS)} FROM bids ORDER BY cargo_id"):
+            yield dict(zip(BID_FIELDS, row))
+
+    def read_player(self):
+        """Return every saved player value as a dict"""
+        return dict(self.conn.execute("SELECT key, value FROM player"))
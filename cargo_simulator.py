@@ -1,10 +1,40 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
-import random
-import csv
 import os
-import json
-from datetime import datetime, timedelta
+import time
+from datetime import date
+
+from cargo_config import load_config, config_key, CONFIG_FILE
+from cargo_engine import CargoMarket, save_snapshot, SAVE_FILE
+from cargo_journal import has_journal, discard_journal
+from cargo_save import read_save
+from cargo_worker import BackgroundTask
+from cargo_view import CargoTreeView
+from cargo_planner import plan_hold, plan_route
+
+# How often the config file is checked for changes (milliseconds)
+CONFIG_POLL_MS = 1000
+
+# Minutes between autosaves - off unless the config sets "autosave_minutes"
+AUTOSAVE_MINUTES = 0
+
+# Save file records passed from the loading thread at a time
+LOAD_CHUNK_ROWS = 5000
+
+# Shortest time between redraws of the listings while a game loads
+LOAD_REDRAW_SECONDS = 0.5
+
+# Lines kept in the market news panel
+NEWS_LINES = 500
+
+# Hold size offered by "Plan Hold..." unless the config sets "hold_tons"
+HOLD_TONS = 200
+
+def format_game_date(ordinal):
+    """Format a game day ordinal in Traveller style: year-day (out of 365)"""
+    game_date = date.fromordinal(ordinal)
+    day_of_year = game_date.timetuple().tm_yday
+    return f"{game_date.year}-{day_of_year:03d}"
 
 class CargoTradingSimulator:
     def __init__(self, root):
@@ -13,28 +43,45 @@ class CargoTradingSimulator:
         self.root.geometry("1300x700")
         
         # Load configuration
-        self.load_config()
+        self.config = load_config()
+        # (mtime, size) of a config edit that failed to load, so it is only reported once
+        self.bad_config_key = None
         
-        # Data structures
-        self.cargo_list = []
-        self.player_credits = self.config["simulation_settings"]["player_starting_credits"]
-        self.current_bids = {}
+        # A .db save file uses the incremental SQLite backend
+        self.save_file = self.config.get("save_file", SAVE_FILE)
+
+        # Headless market engine - the GUI is only a view over it
+        # A "seed" in the config makes the whole game repeatable, and
+        # "record_actions" keeps the log needed to replay it. New listings
+        # take their IDs from a .db save file, which the editor may add to
+        self.market = CargoMarket(self.config, seed=self.config.get("seed"),
+                                  record_actions=self.config.get("record_actions", False), queue_events=True,
+                                  id_path=self.save_file)
+        
+        # Background save or load in progress, if any
+        self.io_task = None
+        # Background task the market has to wait for (a load or a route plan), if any
+        self.blocking_task = None
         
         self.create_gui()
         self.generate_cargo(self.config["simulation_settings"]["initial_cargo_listings"])
-        
-    def load_config(self):
-        """Load configuration from file or create default if not exists"""
-        if os.path.exists("cargo_config.json"):
-            with open("cargo_config.json", "r") as f:
-                self.config = json.load(f)
-        else:
-            self.config = create_default_config()
-            
-        # Convert lists to tuples where needed for compatibility with original code
-        for cargo_type in self.config["cargo_types"]:
-            self.config["cargo_types"][cargo_type]["mass"] = tuple(self.config["cargo_types"][cargo_type]["mass"])
-            self.config["cargo_types"][cargo_type]["value"] = tuple(self.config["cargo_types"][cargo_type]["value"])
+
+        # Changes journaled after the last save mean the last session didn't end with a save
+        if has_journal(self.save_file):
+            if messagebox.askyesno("Recover Game", "The last game has changes that weren't saved. "
+                                   "Recover them?"):
+                self.load_game(recover=True)
+            else:
+                discard_journal(self.save_file)
+
+        # Autosave to the save file every "autosave_minutes", if set
+        autosave_minutes = self.config.get("autosave_minutes", AUTOSAVE_MINUTES)
+        if autosave_minutes:
+            self.autosave_ms = int(autosave_minutes * 60000)
+            self.root.after(self.autosave_ms, self.autosave)
+
+        # Pick up edits to the config file while the game is running
+        self.root.after(CONFIG_POLL_MS, self.watch_config)
         
     def create_gui(self):
         # Main frame
@@ -50,41 +97,29 @@ class CargoTradingSimulator:
         self.date_label.pack(side=tk.LEFT, padx=5)
         
         ttk.Label(info_frame, text="Credits:").pack(side=tk.LEFT, padx=20)
-        self.credits_label = ttk.Label(info_frame, text=f"{self.player_credits:,}")
+        self.credits_label = ttk.Label(info_frame, text=f"{self.market.player_credits:,}")
         self.credits_label.pack(side=tk.LEFT, padx=5)
+
+        # Progress of background saves and loads
+        self.status_label = ttk.Label(info_frame, text="")
+        self.status_label.pack(side=tk.RIGHT, padx=5)
         
         # Cargo listings frame
         cargo_frame = ttk.LabelFrame(main_frame, text="Available Cargo Contracts", padding="10")
         cargo_frame.pack(fill=tk.BOTH, expand=True, pady=10)
         
-        # Create treeview for cargo listings
-        columns = ("ID", "Cargo Type", "Origin", "Destination", "Mass (tons)", 
-                  "Value (cr/ton)", "Total Value", "Shipping Company", "Posted On", "Deadline", "Status")
-        
-        self.cargo_tree = ttk.Treeview(cargo_frame, columns=columns, show="headings")
-        
-        # Configure columns
-        self.cargo_tree.column("ID", width=40, anchor=tk.CENTER)
-        self.cargo_tree.column("Cargo Type", width=150)
-        self.cargo_tree.column("Origin", width=100)
-        self.cargo_tree.column("Destination", width=100)
-        self.cargo_tree.column("Mass (tons)", width=80, anchor=tk.CENTER)
-        self.cargo_tree.column("Value (cr/ton)", width=100, anchor=tk.CENTER)
-        self.cargo_tree.column("Total Value", width=100, anchor=tk.CENTER)
-        self.cargo_tree.column("Shipping Company", width=150)
-        self.cargo_tree.column("Posted On", width=100, anchor=tk.CENTER)
-        self.cargo_tree.column("Deadline", width=100, anchor=tk.CENTER)
-        self.cargo_tree.column("Status", width=100, anchor=tk.CENTER)
-        
-        # Configure headings
-        for col in columns:
-            self.cargo_tree.heading(col, text=col, command=lambda c=col: self.sort_cargo_by_column(c))
-        
-        # Add a scrollbar
-        scrollbar = ttk.Scrollbar(cargo_frame, orient=tk.VERTICAL, command=self.cargo_tree.yview)
-        self.cargo_tree.configure(yscroll=scrollbar.set)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.cargo_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        # Create treeview for cargo listings, with the best bid for each
+        self.cargo_view = CargoTreeView(cargo_frame, heading_command=self.sort_cargo_by_column,
+                                        advisor=self.market.advisor)
+
+        # Market news - bid results and expiries, newest first
+        news_frame = ttk.LabelFrame(main_frame, text="Market News", padding="5")
+        news_frame.pack(fill=tk.X)
+        self.news_list = tk.Listbox(news_frame, height=6)
+        news_scrollbar = ttk.Scrollbar(news_frame, orient=tk.VERTICAL, command=self.news_list.yview)
+        self.news_list.configure(yscrollcommand=news_scrollbar.set)
+        news_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.news_list.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
         # Bottom control frame
         control_frame = ttk.Frame(main_frame, padding="5")
@@ -92,127 +127,168 @@ class CargoTradingSimulator:
         
         ttk.Button(control_frame, text="Place Bid", command=self.place_bid).pack(side=tk.LEFT, padx=5)
         ttk.Button(control_frame, text="View My Bids", command=self.view_bids).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Plan Hold...", command=self.plan_hold).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Plan Route...", command=self.plan_route).pack(side=tk.LEFT, padx=5)
         ttk.Button(control_frame, text="Refresh Listings", command=self.refresh_listings).pack(side=tk.LEFT, padx=5)
         ttk.Button(control_frame, text="Advance Time (1 Week)", command=self.advance_time).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Advance Weeks...", command=self.advance_weeks).pack(side=tk.LEFT, padx=5)
         ttk.Button(control_frame, text="Edit Config", command=self.edit_config).pack(side=tk.LEFT, padx=5)
         ttk.Button(control_frame, text="Save Game", command=self.save_game).pack(side=tk.RIGHT, padx=5)
         ttk.Button(control_frame, text="Load Game", command=self.load_game).pack(side=tk.RIGHT, padx=5)
         
     def generate_cargo(self, count=5):
         """Generate random cargo listings"""
-        current_ids = [cargo["id"] for cargo in self.cargo_list]
-        next_id = 1
-        if current_ids:
-            next_id = max(current_ids) + 1
-            
-        new_cargo = []
-        current_date = datetime.now().strftime("%Y-%m-%d")
-        
-        for _ in range(count):
-            cargo_types = list(self.config["cargo_types"].keys())
-            cargo_type = random.choice(cargo_types)
-            mass_range = self.config["cargo_types"][cargo_type]["mass"]
-            value_range = self.config["cargo_types"][cargo_type]["value"]
-            
-            mass = random.randint(mass_range[0], mass_range[1])
-            value_per_ton = random.randint(value_range[0], value_range[1])
-            
-            # Origin and destination should be different
-            origin = random.choice(self.config["destinations"])
-            destination = random.choice([d for d in self.config["destinations"] if d != origin])
-            
-            # Random deadline between configured weeks from now
-            weeks_range = self.config["simulation_settings"]["cargo_deadline_range_weeks"]
-            weeks = random.randint(weeks_range[0], weeks_range[1])
-            deadline_date = (datetime.now() + timedelta(weeks=weeks)).strftime("%Y-%m-%d")
-            
-            cargo = {
-                "id": next_id,
-                "cargo_type": cargo_type,
-                "origin": origin,
-                "destination": destination,
-                "mass": mass,
-                "value_per_ton": value_per_ton,
-                "total_value": mass * value_per_ton,
-                "shipping_company": random.choice(self.config["shipping_companies"]),
-                "posted_on": current_date,
-                "deadline": deadline_date,
-                "status": "Available"
-            }
-            
-            new_cargo.append(cargo)
-            next_id += 1
-            
-        self.cargo_list.extend(new_cargo)
+        self.market.generate_cargo(count)
         self.update_cargo_display()
         
     def update_cargo_display(self):
         """Update the cargo treeview with current listings"""
-        # Clear the existing items
-        for item in self.cargo_tree.get_children():
-            self.cargo_tree.delete(item)
-            
-        # Insert cargo listings
-        for cargo in self.cargo_list:
-            if cargo["status"] == "Available":  # Only show available cargo
-                values = (
-                    cargo["id"],
-                    cargo["cargo_type"],
-                    cargo["origin"],
-                    cargo["destination"],
-                    f"{cargo['mass']:,}",
-                    f"{cargo['value_per_ton']:,}",
-                    f"{cargo['total_value']:,}",
-                    cargo["shipping_company"],
-                    cargo["posted_on"],
-                    cargo["deadline"],
-                    cargo["status"]
-                )
-                self.cargo_tree.insert("", tk.END, values=values)
+        # Only available cargo is shown
+        self.cargo_view.show(self.market.available_cargo())
                 
+    def busy(self):
+        """Whether market actions have to wait for a background task, telling the player so"""
+        if self.blocking_task and self.blocking_task.running():
+            messagebox.showinfo("Busy", "Please wait for the current load or route plan to finish.")
+            return True
+        return False
+
     def place_bid(self):
         """Place a bid on selected cargo"""
-        selected_item = self.cargo_tree.selection()
-        if not selected_item:
+        if self.busy():
+            return
+        cargo_id = self.cargo_view.selected_cargo_id()
+        if cargo_id is None:
             messagebox.showwarning("Selection Required", "Please select a cargo listing to bid on.")
             return
             
-        # Get the cargo ID from the selected item
-        cargo_id = int(self.cargo_tree.item(selected_item[0], "values")[0])
-        
         # Find the cargo in our list
-        cargo = next((c for c in self.cargo_list if c["id"] == cargo_id), None)
+        cargo = self.market.get_cargo(cargo_id)
         if not cargo:
             messagebox.showerror("Error", "Cargo not found.")
             return
             
         # Ask for bid amount
-        suggested_bid = int(cargo["total_value"] * 0.85)  # 85% of total value as suggestion
+        suggested_bid, win_chance, expected = self.market.advisor.advise(cargo["total_value"])
         bid_prompt = f"Enter your bid amount for {cargo['cargo_type']} to {cargo['destination']}:\n"
-        bid_prompt += f"(Suggested bid: {suggested_bid:,} credits)"
+        bid_prompt += (f"(Suggested bid: {suggested_bid:,} credits - {win_chance:.0%} chance to win, "
+                       f"{expected:,.0f} credits expected profit)")
         
         bid_amount = simpledialog.askinteger("Place Bid", bid_prompt, 
                                             initialvalue=suggested_bid,
-                                            minvalue=1, 
+                                            minvalue=self.market.minimum_bid(cargo["total_value"]),
                                             maxvalue=cargo["total_value"] * 2)
         
         if bid_amount is None:  # User cancelled
             return
             
         # Record the bid
-        self.current_bids[cargo_id] = {
-            "amount": bid_amount,
-            "cargo": cargo,
-            "status": "Pending",
-            "bid_date": datetime.now().strftime("%Y-%m-%d")
-        }
+        try:
+            self.market.place_bid(cargo_id, bid_amount)
+        except ValueError as e:
+            messagebox.showerror("Bid Not Placed", str(e))
+            return
         
         messagebox.showinfo("Bid Placed", f"Your bid of {bid_amount:,} credits has been submitted. "
                             f"Check 'View My Bids' to see the status.")
                             
+    def plan_hold(self):
+        """Pick the listings at one world that fill the hold for the most expected profit, and bid on them"""
+        if self.busy():
+            return
+        # Plan from the selected listing's world, or ask for one
+        cargo_id = self.cargo_view.selected_cargo_id()
+        cargo = self.market.get_cargo(cargo_id) if cargo_id is not None else None
+        origin = simpledialog.askstring("Plan Hold", "Pick up cargo at which world?",
+                                        initialvalue=cargo["origin"] if cargo else self.config.destinations[0])
+        if origin is None:  # User cancelled
+            return
+        hold_tons = simpledialog.askinteger("Plan Hold", "How many tons does your hold take?",
+                                            initialvalue=self.config.get("hold_tons", HOLD_TONS),
+                                            minvalue=1, maxvalue=100000)
+        if hold_tons is None:
+            return
+
+        # Credits already tied up in pending bids aren't available
+        budget = self.market.available_credits()
+        listings = [cargo for cargo in self.market.available_cargo()
+                    if cargo["id"] not in self.market.current_bids]
+        plan = plan_hold(listings, self.market.advisor, hold_tons, budget, origin)
+        if not plan["cargo"]:
+            messagebox.showinfo("Plan Hold", f"No open listings at {origin} fit your hold and budget.")
+            return
+
+        if not messagebox.askyesno("Plan Hold",
+                                   f"Bid on {len(plan['cargo']):,} listings at {origin}: {plan['mass']:,} of "
+                                   f"{hold_tons:,} tons, {plan['bids']:,} credits in bids and "
+                                   f"{plan['expected_profit']:,.0f} credits expected profit. Place these bids?"):
+            return
+        for cargo in plan["cargo"]:
+            self.market.place_bid(cargo["id"], self.market.suggested_bid(cargo))
+
+    def plan_route(self):
+        """Find the chain of contracts with the most expected profit per week, and bid on them"""
+        if self.busy():
+            return
+        cargo_id = self.cargo_view.selected_cargo_id()
+        cargo = self.market.get_cargo(cargo_id) if cargo_id is not None else None
+        start = simpledialog.askstring("Plan Route", "Start from which world?",
+                                       initialvalue=cargo["origin"] if cargo else self.config.destinations[0])
+        if start is None:  # User cancelled
+            return
+        max_weeks = simpledialog.askinteger("Plan Route", "Plan at most how many weeks ahead?",
+                                            initialvalue=self.config.deadline_weeks[1], minvalue=1, maxvalue=52)
+        if max_weeks is None:
+            return
+
+        listings = [cargo for cargo in self.market.available_cargo()
+                    if cargo["id"] not in self.market.current_bids]
+        today = self.market.today
+        hold_tons = self.config.get("hold_tons", HOLD_TONS)
+        self.status_label.config(text="Planning route...")
+
+        def done(route):
+            self.status_label.config(text="")
+            contracts = [cargo for _, _, _, cargo in route["legs"] if cargo is not None]
+            if not contracts:
+                messagebox.showinfo("Plan Route", f"No open contracts can be chained from {start}.")
+                return
+
+            lines = []
+            for week, origin, destination, cargo in route["legs"]:
+                if cargo is None:
+                    action = "wait" if origin == destination else f"jump empty to {destination}"
+                else:
+                    action = f"{cargo['cargo_type']} to {destination} (cargo {cargo['id']}, due {cargo['deadline']})"
+                lines.append(f"Week {week + 1}, {origin}: {action}")
+            if not route["complete"]:
+                lines.append("(The search was cut short - a slightly better route may exist.)")
+            if not messagebox.askyesno("Plan Route", "\n".join(lines) +
+                                       f"\n\n{route['profit']:,.0f} credits expected profit over {route['weeks']} "
+                                       f"weeks ({route['profit_per_week']:,.0f} per week). Bid on these contracts?"):
+                return
+            for cargo in contracts:
+                try:
+                    self.market.place_bid(cargo["id"], self.market.suggested_bid(cargo))
+                except ValueError as e:
+                    messagebox.showwarning("Plan Route", f"Stopped bidding at cargo {cargo['id']}: {e}")
+                    return
+
+        def failed(error):
+            self.status_label.config(text="")
+            messagebox.showerror("Plan Route", f"Error planning route: {str(error)}")
+
+        # Long horizons can take a while, so plan on a worker thread while market actions wait
+        self.blocking_task = BackgroundTask(
+            self.root, lambda report: plan_route(listings, self.market.advisor, start, today, max_weeks, hold_tons),
+            on_done=done, on_error=failed)
+
     def view_bids(self):
         """View the player's current bids"""
-        if not self.current_bids:
+        if self.busy():
+            return
+        archived = self.market.archived
+        if not self.market.current_bids and not (archived["accepted"] or archived["rejected"]):
             messagebox.showinfo("No Bids", "You haven't placed any bids yet.")
             return
             
@@ -220,6 +296,12 @@ class CargoTradingSimulator:
         bid_window = tk.Toplevel(self.root)
         bid_window.title("My Cargo Bids")
         bid_window.geometry("800x400")
+
+        # Older resolved bids are only summarized
+        if archived["accepted"] or archived["rejected"]:
+            ttk.Label(bid_window, text=f"Older bids: {archived['accepted']:,} accepted "
+                                       f"({archived['accepted_value']:,} credits), "
+                                       f"{archived['rejected']:,} rejected").pack(side=tk.TOP, anchor=tk.W, padx=5, pady=5)
         
         # Create treeview for bids
         columns = ("Cargo ID", "Cargo Type", "Destination", "Bid Amount", "Status", "Date")
@@ -242,7 +324,7 @@ class CargoTradingSimulator:
         bid_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
         # Insert bid data
-        for cargo_id, bid_info in self.current_bids.items():
+        for cargo_id, bid_info in self.market.current_bids.items():
             cargo = bid_info["cargo"]
             values = (
                 cargo_id,
@@ -256,254 +338,198 @@ class CargoTradingSimulator:
             
     def refresh_listings(self):
         """Refresh cargo listings - remove old ones and add new ones"""
-        # Remove expired listings
-        today = datetime.now()
-        self.cargo_list = [cargo for cargo in self.cargo_list if 
-                          cargo["status"] == "Available" and 
-                          datetime.strptime(cargo["deadline"], "%Y-%m-%d") > today]
-        
-        # Generate new cargo
-        new_cargo_range = self.config["simulation_settings"]["new_cargo_per_refresh"]
-        self.generate_cargo(random.randint(new_cargo_range[0], new_cargo_range[1]))
+        if self.busy():
+            return
+        self.market.refresh_listings()
+        self.update_cargo_display()
+        self.show_news()
         
     def advance_time(self):
         """Advance game time by one week and process pending bids"""
-        # Process bids
-        thresholds = self.config["simulation_settings"]["cargo_acceptance_thresholds"]
-        
-        for cargo_id, bid_info in list(self.current_bids.items()):
-            if bid_info["status"] == "Pending":
-                # Determine win chance based on bid amount
-                cargo_value = bid_info["cargo"]["total_value"]
-                if bid_info["amount"] >= cargo_value * thresholds["high_chance"]:
-                    win_chance = self.config["simulation_settings"]["high_win_chance"]
-                elif bid_info["amount"] >= cargo_value * thresholds["medium_chance"]:
-                    win_chance = self.config["simulation_settings"]["medium_win_chance"]
-                else:
-                    win_chance = self.config["simulation_settings"]["low_win_chance"]
-                    
-                if random.random() < win_chance:
-                    self.current_bids[cargo_id]["status"] = "Accepted"
-                    
-                    # Remove the cargo from available listings
-                    for cargo in self.cargo_list:
-                        if cargo["id"] == cargo_id:
-                            cargo["status"] = "Contracted"
-                            break
-                            
-                    messagebox.showinfo("Bid Accepted", 
-                                       f"Your bid of {bid_info['amount']:,} credits for the "
-                                       f"{bid_info['cargo']['cargo_type']} cargo to "
-                                       f"{bid_info['cargo']['destination']} has been accepted!")
-                else:
-                    self.current_bids[cargo_id]["status"] = "Rejected"
+        if self.busy():
+            return
+        self.market.advance_weeks(1)
         
         # Update the display
         self.update_cargo_display()
-        
-        # Update date display (advance by 1 week)
-        self.date_label.config(text=self.get_game_date(7))
+        self.credits_label.config(text=f"{self.market.player_credits:,}")
+        self.date_label.config(text=self.get_game_date())
+        self.show_news()
+
+    def advance_weeks(self):
+        """Fast-forward several weeks, redrawing and reporting only once at the end"""
+        if self.busy():
+            return
+        weeks = simpledialog.askinteger("Advance Weeks", "How many weeks should pass?",
+                                        initialvalue=4, minvalue=1, maxvalue=520)
+        if weeks is None:  # User cancelled
+            return
+
+        self.market.advance_weeks(weeks)
+
+        self.update_cargo_display()
+        self.credits_label.config(text=f"{self.market.player_credits:,}")
+        self.date_label.config(text=self.get_game_date())
+        self.show_news()
+
+    def show_news(self):
+        """Move the market's queued events into the news panel in one update"""
+        lines = []
+        expired = 0
+        for event in self.market.drain_events():
+            if event["kind"] == "cargo_expired":
+                expired += 1
+                continue
+            bid = event["bid"]
+            result = "accepted" if event["kind"] == "bid_accepted" else "rejected"
+            lines.append(f"{format_game_date(event['date'])}  Your bid of {bid['amount']:,} credits for the "
+                         f"{bid['cargo']['cargo_type']} cargo to {bid['cargo']['destination']} was {result}")
+        if expired:
+            lines.append(f"{self.get_game_date()}  {expired:,} listings expired")
+
+        if lines:
+            self.news_list.insert(0, *reversed(lines))
+            self.news_list.delete(NEWS_LINES, tk.END)
         
     def get_game_date(self, days_to_add=0):
         """Get the current game date, optionally adding days"""
-        game_date = datetime.now() + timedelta(days=days_to_add)
-        # Format in Traveller style date: year-day (out of 365)
-        year = game_date.year
-        day_of_year = game_date.timetuple().tm_yday
-        return f"{year}-{day_of_year:03d}"
+        return format_game_date(self.market.today + days_to_add)
     
     def edit_config(self):
         """Open a simple editor for the configuration file"""
         messagebox.showinfo("Edit Configuration", 
                            "The configuration file will open in your default text editor. "
-                           "After saving changes, restart the application for them to take effect.")
+                           "Saved changes take effect straight away for newly posted cargo.")
         
         # Open the config file in the default editor
-        os.system(f"start cargo_config.json" if os.name == "nt" else f"open cargo_config.json")
+        os.system(f"start {CONFIG_FILE}" if os.name == "nt" else f"open {CONFIG_FILE}")
         
+    def watch_config(self):
+        """Reload the config when its file changes, then check again later"""
+        try:
+            key = config_key(CONFIG_FILE)
+        except OSError:
+            key = None  # The file is being replaced - look again next time
+
+        try:
+            # load_config() hands back the config in use while the file is unchanged
+            if key is not None and key != self.bad_config_key:
+                config = load_config(previous=self.config)
+                if config is not self.config:
+                    # The market only reads the config when it generates or resolves, so swapping is
+                    # safe. It checks the new config before switching, so a bad one changes nothing
+                    redraw = self.market.set_config(config)
+                    self.config = config
+                    # Redraw the page only if the best bids changed
+                    if redraw:
+                        self.cargo_view.show_page(self.cargo_view.page)
+        except (ValueError, KeyError, TypeError, AttributeError, OSError) as e:
+            self.bad_config_key = key
+            messagebox.showerror("Config Error", f"Config file not reloaded, keeping the previous settings: {str(e)}")
+        finally:
+            self.root.after(CONFIG_POLL_MS, self.watch_config)
+
     def sort_cargo_by_column(self, column):
         """Sort the cargo listings by the selected column"""
-        column_index = self.cargo_tree["columns"].index(column)
-        
-        # Get all items with their values
-        items_with_values = [(self.cargo_tree.item(item, "values"), item) for item in self.cargo_tree.get_children()]
-        
-        # Sort based on the column type
-        if column in ["Mass (tons)", "Value (cr/ton)", "Total Value", "ID"]:
-            # Sort numerically after removing commas and converting to int
-            items_with_values.sort(key=lambda x: int(x[0][column_index].replace(",", "")))
-        else:
-            # Sort alphabetically
-            items_with_values.sort(key=lambda x: x[0][column_index])
+        self.cargo_view.sort_by(column)
             
-        # Rearrange items in the treeview
-        for index, (values, item) in enumerate(items_with_values):
-            self.cargo_tree.move(item, "", index)
-            
-    def save_game(self):
-        """Save the current game state"""
+    def save_game(self, autosave=False):
+        """Save the current game state on a worker thread"""
+        if self.io_task and self.io_task.running():
+            if not autosave:
+                messagebox.showinfo("Busy", "Please wait for the current save or load to finish.")
+            return
+
+        # Changes from here on belong to the next save
+        path = self.save_file
         try:
-            with open("cargo_sim_save.csv", "w", newline="") as file:
-                writer = csv.writer(file)
-                
-                # Write header row
-                writer.writerow(["CARGO_DATA"])
-                writer.writerow(["id", "cargo_type", "origin", "destination", "mass", 
-                                "value_per_ton", "total_value", "shipping_company", 
-                                "posted_on", "deadline", "status"])
-                
-                # Write cargo data
-                for cargo in self.cargo_list:
-                    writer.writerow([
-                        cargo["id"],
-                        cargo["cargo_type"],
-                        cargo["origin"],
-                        cargo["destination"],
-                        cargo["mass"],
-                        cargo["value_per_ton"],
-                        cargo["total_value"],
-                        cargo["shipping_company"],
-                        cargo["posted_on"],
-                        cargo["deadline"],
-                        cargo["status"]
-                    ])
-                    
-                # Write bid data
-                writer.writerow(["BID_DATA"])
-                writer.writerow(["cargo_id", "amount", "status", "bid_date"])
-                
-                for cargo_id, bid_info in self.current_bids.items():
-                    writer.writerow([
-                        cargo_id,
-                        bid_info["amount"],
-                        bid_info["status"],
-                        bid_info["bid_date"]
-                    ])
-                    
-                # Write player data
-                writer.writerow(["PLAYER_DATA"])
-                writer.writerow(["credits"])
-                writer.writerow([self.player_credits])
-                
-            messagebox.showinfo("Game Saved", "Game saved successfully.")
-        except Exception as e:
-            messagebox.showerror("Save Error", f"Error saving game: {str(e)}")
+            snapshot = self.market.begin_save(path)
+        except (ValueError, OSError) as e:
+            if not autosave:
+                messagebox.showerror("Save Error", f"Error saving game: {str(e)}")
+            return
+
+        self.status_label.config(text="Autosaving..." if autosave else "Saving...")
+
+        def progress(value):
+            done, total = value
+            self.status_label.config(text=f"Saving... {done:,} of {total:,} listings")
+
+        def done(result):
+            self.market.end_save(snapshot)
+            self.status_label.config(text=f"{'Autosaved' if autosave else 'Game saved'} on {self.get_game_date()}")
+
+        def failed(error):
+            self.market.end_save(snapshot, False)
+            self.status_label.config(text="Save failed")
+            messagebox.showerror("Save Error", f"Error saving game: {str(error)}")
+
+        def write(report):
+            save_snapshot(snapshot, path, lambda done, total: report((done, total)))
+
+        self.io_task = BackgroundTask(self.root, write, on_done=done, on_progress=progress, on_error=failed)
+
+    def autosave(self):
+        """Save in the background every few minutes, once this game has been saved or loaded"""
+        # A fresh market that was never saved or loaded mustn't overwrite the campaign in the save file
+        if self.market.save_path == self.save_file:
+            self.save_game(autosave=True)
+        self.root.after(self.autosave_ms, self.autosave)
             
-    def load_game(self):
-        """Load a saved game state"""
-        if not os.path.exists("cargo_sim_save.csv"):
+    def load_game(self, recover=False):
+        """Load a saved game state on a worker thread, showing listings as they arrive
+
+        With recover, changes made after the save was last written are replayed too.
+        """
+        if not os.path.exists(self.save_file):
             messagebox.showerror("Load Error", "No saved game found.")
             return
-            
-        try:
-            with open("cargo_sim_save.csv", "r") as file:
-                reader = csv.reader(file)
-                
-                section = None
-                self.cargo_list = []
-                self.current_bids = {}
-                
-                for row in reader:
-                    if not row:
-                        continue
-                        
-                    if row[0] == "CARGO_DATA":
-                        section = "cargo"
-                        continue
-                    elif row[0] == "BID_DATA":
-                        section = "bids"
-                        continue
-                    elif row[0] == "PLAYER_DATA":
-                        section = "player"
-                        continue
-                        
-                    if section == "cargo" and row[0] != "id":
-                        cargo = {
-                            "id": int(row[0]),
-                            "cargo_type": row[1],
-                            "origin": row[2],
-                            "destination": row[3],
-                            "mass": int(row[4]),
-                            "value_per_ton": int(row[5]),
-                            "total_value": int(row[6]),
-                            "shipping_company": row[7],
-                            "posted_on": row[8],
-                            "deadline": row[9],
-                            "status": row[10]
-                        }
-                        self.cargo_list.append(cargo)
-                    elif section == "bids" and row[0] != "cargo_id":
-                        cargo_id = int(row[0])
-                        # Find the corresponding cargo
-                        cargo = next((c for c in self.cargo_list if c["id"] == cargo_id), None)
-                        
-                        if cargo:
-                            self.current_bids[cargo_id] = {
-                                "amount": int(row[1]),
-                                "status": row[2],
-                                "bid_date": row[3],
-                                "cargo": cargo
-                            }
-                    elif section == "player" and row[0] != "credits":
-                        self.player_credits = int(row[0])
-                        self.credits_label.config(text=f"{self.player_credits:,}")
-                        
+        if self.io_task and self.io_task.running():
+            messagebox.showinfo("Busy", "Please wait for the current save or load to finish.")
+            return
+        if self.busy():
+            return
+
+        path = self.save_file
+        load = self.market.begin_load(path, recover=recover)
+        last_redraw = [0.0]
+        self.status_label.config(text="Loading...")
+
+        def read(report):
+            chunk = []
+            for item in read_save(path):
+                chunk.append(item)
+                if len(chunk) >= LOAD_CHUNK_ROWS:
+                    report(chunk)
+                    chunk = []
+            if chunk:
+                report(chunk)
+
+        def progress(chunk):
+            for section, record in chunk:
+                load.add(section, record)
+            # Show what has arrived so far, but don't redraw on every chunk
+            now = time.monotonic()
+            if now - last_redraw[0] >= LOAD_REDRAW_SECONDS:
+                last_redraw[0] = now
+                self.cargo_view.show(load.cargo.with_status("Available"))
+                self.status_label.config(text=f"Loading... {len(load.cargo):,} listings")
+
+        def done(result):
+            self.market.finish_load(load)
+            self.credits_label.config(text=f"{self.market.player_credits:,}")
+            self.date_label.config(text=self.get_game_date())
             self.update_cargo_display()
-            messagebox.showinfo("Game Loaded", "Game loaded successfully.")
-        except Exception as e:
-            messagebox.showerror("Load Error", f"Error loading game: {str(e)}")
-
-def create_default_config():
-    """Create default configuration file if none exists"""
-    config = {
-        "cargo_types": {
-            "Agricultural Products": {"mass": [5, 200], "value": [500, 2000]},
-            "Refined Metals": {"mass": [10, 100], "value": [2000, 8000]},
-            "Luxury Goods": {"mass": [1, 20], "value": [10000, 50000]},
-            "Medical Supplies": {"mass": [2, 30], "value": [5000, 15000]},
-            "Industrial Equipment": {"mass": [20, 150], "value": [3000, 12000]},
-            "Consumer Electronics": {"mass": [5, 50], "value": [4000, 12000]},
-            "Processed Food": {"mass": [10, 100], "value": [800, 2500]},
-            "Textiles": {"mass": [5, 60], "value": [1000, 3000]},
-            "Construction Materials": {"mass": [50, 300], "value": [600, 2000]},
-            "Pharmaceuticals": {"mass": [1, 15], "value": [20000, 80000]},
-            "Hazardous Materials": {"mass": [10, 80], "value": [3000, 15000]},
-            "Research Equipment": {"mass": [1, 10], "value": [25000, 100000]}
-        },
-        "shipping_companies": [
-            "Interstellar Logistics", "Orion Freight Ltd.", "Nova Express",
-            "Stellar Shipping Co.", "Artemis Cargo Systems", "Cygnus Transport",
-            "Phoenix Carriers", "Meridian Trade Alliance", "Eclipse Haulers",
-            "Vega Commercial Lines", "Antares Shipping Guild", "Frontier Movers",
-            "Imperial Haulage", "Zhodani Consulate Shipping", "Solomani Transport"
-        ],
-        "destinations": [
-            "Regina", "Mora", "Terra", "Vland", "Deneb", "Zhodane", "Sylea",
-            "Corridor", "Trojan Reach", "Spinward Marches", "Karin", "Diaspora",
-            "Core", "Gateway", "Far Frontiers", "Hinterworlds", "Solomani Rim",
-            "Alpha Centauri", "Riftspan Reaches", "Empty Quarter", "Ley Sector",
-            "Magyar", "Verge", "Foreven", "Beyond", "Depot"
-        ],
-        "simulation_settings": {
-            "initial_cargo_listings": 15,
-            "new_cargo_per_refresh": [3, 8],
-            "player_starting_credits": 10000,
-            "cargo_deadline_range_weeks": [2, 6],
-            "cargo_acceptance_thresholds": {
-                "high_chance": 0.8,  # 80% of cargo value - 70% chance of winning
-                "medium_chance": 0.6  # 60% of cargo value - 40% chance of winning
-                # below medium_chance - 20% chance of winning
-            },
-            "high_win_chance": 0.7,
-            "medium_win_chance": 0.4,
-            "low_win_chance": 0.2
-        }
-    }
-    
-    with open("cargo_config.json", "w") as f:
-        json.dump(config, f, indent=4)
-    
-    return config
+            self.status_label.config(text="Game loaded")
+
+        def failed(error):
+            self.update_cargo_display()
+            self.status_label.config(text="Load failed")
+            messagebox.showerror("Load Error", f"Error loading game: {str(error)}")
+
+        # The listings shown while loading aren't the market's yet, so market actions wait
+        self.io_task = self.blocking_task = BackgroundTask(self.root, read, on_done=done, on_progress=progress,
+                                                           on_error=failed)
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,432 @@
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+from itertools import compress
+
+# Column order shared by every save format
+CARGO_FIELDS = ["id", "cargo_type", "origin", "destination", "mass",
+                "value_per_ton", "total_value", "shipping_company",
+                "posted_on", "deadline", "status"]
+
+# Repeated strings are stored as integer codes into a per-field table
+CATEGORY_FIELDS = ("cargo_type", "origin", "destination", "shipping_company", "status")
+
+# ISO date strings are stored as day ordinals
+DATE_FIELDS = ("posted_on", "deadline")
+
+# Array type code for each column except the ID
+COLUMN_TYPES = {
+    "cargo_type": "I",
+    "origin": "I",
+    "destination": "I",
+    "mass": "i",
+    "value_per_ton": "i",
+    "total_value": "q",
+    "shipping_company": "I",
+    "posted_on": "i",
+    "deadline": "i",
+    "status": "I"
+}
+
+# Compact once removed rows outnumber live ones (and there are at least this many)
+COMPACT_MIN_ROWS = 1024
+
+_date_strings = {}
+_date_ordinals = {}
+
+
+def date_to_ordinal(text):
+    """Convert a YYYY-MM-DD string to a day ordinal (cached - there are few distinct dates)"""
+    ordinal = _date_ordinals.get(text)
+    if ordinal is None:
+        ordinal = datetime.strptime(text, "%Y-%m-%d").toordinal()
+        _date_ordinals[text] = ordinal
+    return ordinal
+
+
+def ordinal_to_date(ordinal):
+    """Convert a day ordinal back to a YYYY-MM-DD string"""
+    text = _date_strings.get(ordinal)
+    if text is None:
+        text = datetime.fromordinal(ordinal).strftime("%Y-%m-%d")
+        _date_strings[ordinal] = text
+    return text
+
+
+class Categories:
+    """Two-way mapping between strings and small integer codes"""
+
+    def __init__(self):
+        self.names = []
+        self.codes = {}
+
+    def code(self, name):
+        """Return the code for a name, assigning a new one if needed"""
+        code = self.codes.get(name)
+        if code is None:
+            code = len(self.names)
+            self.names.append(name)
+            self.codes[name] = code
+        return code
+
+
+class CargoRecord:
+    """View of one listing in a CargoStore that reads and writes like a cargo dict
+
+    Records hold no data themselves, so they cost the same few bytes
+    whatever the listing contains. A record stays readable after its
+    listing is removed until the store next compacts; keep the dict
+    returned by CargoStore.remove() if the data is needed for longer.
+    """
+
+    __slots__ = ("store", "cargo_id", "row", "generation")
+
+    def __init__(self, store, cargo_id, row):
+        self.store = store
+        self.cargo_id = cargo_id
+        self.row = row
+        self.generation = store.generation
+
+    def locate(self):
+        """Row of this listing in the store's columns"""
+        if self.generation != self.store.generation:
+            row = self.store.row_of(self.cargo_id)
+            if row is None:
+                raise KeyError(f"Cargo {self.cargo_id} is no longer in the store")
+            self.row = row
+            self.generation = self.store.generation
+        return self.row
+
+    def __getitem__(self, field):
+        if field == "id":
+            return self.cargo_id
+        return self.store.decode(field, self.store.columns[field][self.locate()])
+
+    def __setitem__(self, field, value):
+        self.store.set_field(self.cargo_id, field, value)
+
+    def get(self, field, default=None):
+        try:
+            return self[field]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return list(CARGO_FIELDS)
+
+    def __iter__(self):
+        return iter(CARGO_FIELDS)
+
+    def as_dict(self):
+        """Return the listing as a plain cargo dict"""
+        return {field: self[field] for field in CARGO_FIELDS}
+
+    def __eq__(self, other):
+        if isinstance(other, CargoRecord):
+            other = other.as_dict()
+        return self.as_dict() == other
+
+    def __repr__(self):
+        return f"CargoRecord({self.as_dict()!r})"
+
+
+class RecordList:
+    """Read-only sequence of the CargoRecords for some IDs, created only on access"""
+
+    def __init__(self, store, ids):
+        self.store = store
+        self.ids = ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return RecordList(self.store, self.ids[index])
+        return self.store.get(self.ids[index])
+
+    def __iter__(self):
+        for cargo_id in self.ids:
+            yield self.store.get(cargo_id)
+
+
+class CargoStore:
+    """Columnar store of cargo listings with fast lookup by ID"""
+
+    def __init__(self, cargo_list=()):
+        self.categories = {field: Categories() for field in CATEGORY_FIELDS}
+        # (field, function turning a field value into its stored value) per column
+        self.encoders = [(field, self.categories[field].code if field in self.categories
+                          else date_to_ordinal if field in DATE_FIELDS else int)
+                         for field in COLUMN_TYPES]
+        self.reset()
+        for cargo in cargo_list:
+            self.add(cargo)
+
+    def reset(self):
+        """Empty every column"""
+        # Rows in ascending ID order, so an ID is found by binary search
+        self.ids = array("q")
+        # Removed rows are only flagged until they outnumber the live ones and are compacted
+        self.alive = bytearray()
+        self.columns = {field: array(code) for field, code in COLUMN_TYPES.items()}
+        self.live = 0
+        self.max_id = 0
+        # Bumped whenever rows move, so records know to look themselves up again
+        self.generation = 0
+        # Rows before this index were saved; later ones are new since the last save
+        self.synced_rows = 0
+        # IDs changed or removed since clear_changes(), for incremental saves
+        self.changed = set()
+        self.removed = set()
+
+    def __len__(self):
+        return self.live
+
+    def __iter__(self):
+        for row in range(len(self.ids)):
+            if self.alive[row]:
+                yield CargoRecord(self, self.ids[row], row)
+
+    def __contains__(self, cargo_id):
+        return self.row_of(cargo_id) is not None
+
+    def row_of(self, cargo_id):
+        """Row index of a live listing, or None"""
+        row = bisect_left(self.ids, cargo_id)
+        if row < len(self.ids) and self.ids[row] == cargo_id and self.alive[row]:
+            return row
+        return None
+
+    def encode(self, field, value):
+        """Convert a field value to what is stored in its column"""
+        if field in self.categories:
+            return self.categories[field].code(value)
+        if field in DATE_FIELDS:
+            return date_to_ordinal(value)
+        return value
+
+    def decode(self, field, value):
+        """Convert a stored column value back to the field value"""
+        if field in self.categories:
+            return self.categories[field].names[value]
+        if field in DATE_FIELDS:
+            return ordinal_to_date(value)
+        return value
+
+    def get(self, cargo_id):
+        """Find a cargo listing by ID, or None if it doesn't exist"""
+        row = self.row_of(cargo_id)
+        if row is None:
+            return None
+        return CargoRecord(self, cargo_id, row)
+
+    def next_id(self):
+        """Return the next unused cargo ID"""
+        return self.max_id + 1
+
+    def add(self, cargo):
+        """Add a listing, replacing any existing listing with the same ID
+
+        Only the standard CARGO_FIELDS are stored; other keys are ignored.
+        """
+        cargo_id = cargo["id"]
+        encoded = [(field, encode(cargo[field])) for field, encode in self.encoders]
+
+        if cargo_id > self.max_id:
+            self.ids.append(cargo_id)
+            self.alive.append(1)
+            for field, value in encoded:
+                self.columns[field].append(value)
+            self.max_id = cargo_id
+            self.live += 1
+            self.removed.discard(cargo_id)
+            return
+
+        row = bisect_left(self.ids, cargo_id)
+        if row < len(self.ids) and self.ids[row] == cargo_id:
+            # Reuse the row, reviving it if it was removed
+            if not self.alive[row]:
+                self.alive[row] = 1
+                self.live += 1
+            for field, value in encoded:
+                self.columns[field][row] = value
+        else:
+            # Out-of-order ID - insert it where it belongs
+            self.ids.insert(row, cargo_id)
+            self.alive.insert(row, 1)
+            for field, value in encoded:
+                self.columns[field].insert(row, value)
+            self.live += 1
+            self.generation += 1
+            if row < self.synced_rows:
+                self.synced_rows += 1
+
+        self.changed.add(cargo_id)
+        self.removed.discard(cargo_id)
+
+    def extend(self, cargo_list):
+        """Add several listings"""
+        for cargo in cargo_list:
+            self.add(cargo)
+
+    def extend_encoded(self, ids, columns):
+        """Append listings given as already-encoded columns
+
+        ids must be an ascending array("q") above every ID in the store, and
+        columns maps each field in COLUMN_TYPES to an array of its stored
+        values (see encode()) with the type code in COLUMN_TYPES. This is
+        the fast path for bulk generation.
+        """
+        if not ids:
+            return
+        if ids[0] <= self.max_id:
+            raise ValueError("Encoded listings must have IDs above those already stored")
+        self.ids.extend(ids)
+        self.alive.extend(b"\x01" * len(ids))
+        for field in COLUMN_TYPES:
+            self.columns[field].extend(columns[field])
+        self.max_id = ids[-1]
+        self.live += len(ids)
+
+    def replace(self, cargo):
+        """Replace an existing listing in place, keeping its position"""
+        if self.row_of(cargo["id"]) is None:
+            raise KeyError(f"Cargo {cargo['id']} not found")
+        self.add(cargo)
+
+    def set_field(self, cargo_id, field, value):
+        """Change one field of a listing"""
+        row = self.row_of(cargo_id)
+        if row is None:
+            raise KeyError(f"Cargo {cargo_id} not found")
+        if field not in self.columns:
+            raise KeyError(f"Cargo field {field!r} can't be changed")
+        self.columns[field][row] = self.encode(field, value)
+        if row < self.synced_rows:
+            self.changed.add(cargo_id)
+
+    def mark_changed(self, cargo_id):
+        """Record that a listing was modified in place (e.g. its status)"""
+        if cargo_id in self:
+            self.changed.add(cargo_id)
+
+    def remove(self, cargo_id):
+        """Remove a listing by ID and return it as a plain dict (None if it wasn't there)"""
+        row = self.row_of(cargo_id)
+        if row is None:
+            return None
+        cargo = CargoRecord(self, cargo_id, row).as_dict()
+        self.discard(cargo_id)
+        return cargo
+
+    def discard(self, cargo_id):
+        """Remove a listing by ID without copying it, returning whether it was there"""
+        row = self.row_of(cargo_id)
+        if row is None:
+            return False
+
+        self.alive[row] = 0
+        self.live -= 1
+        self.changed.discard(cargo_id)
+        self.removed.add(cargo_id)
+
+        dead = len(self.ids) - self.live
+        if dead > self.live and dead >= COMPACT_MIN_ROWS:
+            self.compact()
+        return True
+
+    def compact(self):
+        """Drop removed rows from every column"""
+        alive = self.alive
+        self.synced_rows = alive[:self.synced_rows].count(1)
+        self.ids = array("q", compress(self.ids, alive))
+        for field, code in COLUMN_TYPES.items():
+            self.columns[field] = array(code, compress(self.columns[field], alive))
+        self.alive = bytearray(b"\x01" * self.live)
+        self.generation += 1
+
+    def clear(self):
+        """Remove all listings"""
+        removed = self.removed
+        removed.update(cargo_id for cargo_id, alive in zip(self.ids, self.alive) if alive)
+        self.reset()
+        self.removed = removed
+
+    def rows(self, records=None, start=0):
+        """Yield listings as value tuples in CARGO_FIELDS order, straight from the columns
+
+        Without records every live listing from row start on is yielded.
+        This is much faster than reading each field through a CargoRecord,
+        so save writers use it.
+        """
+        if records is not None:
+            for cargo in records:
+                yield tuple(cargo[field] for field in CARGO_FIELDS)
+            return
+
+        names = {field: categories.names for field, categories in self.categories.items()}
+        columns = [self.ids, self.alive]
+        for field in CARGO_FIELDS[1:]:
+            columns.append(self.columns[field])
+        if start:
+            columns = [column[start:] for column in columns]
+
+        for (cargo_id, alive, cargo_type, origin, destination, mass, value_per_ton,
+             total_value, company, posted_on, deadline, status) in zip(*columns):
+            if alive:
+                yield (cargo_id, names["cargo_type"][cargo_type], names["origin"][origin],
+                       names["destination"][destination], mass, value_per_ton, total_value,
+                       names["shipping_company"][company], ordinal_to_date(posted_on),
+                       ordinal_to_date(deadline), names["status"][status])
+
+    def changed_records(self):
+        """Return the listings added or modified since the last clear_changes()"""
+        records = [self.get(cargo_id) for cargo_id in self.changed]
+        records = [cargo for cargo in records if cargo is not None]
+        for row in range(self.synced_rows, len(self.ids)):
+            if self.alive[row] and self.ids[row] not in self.changed:
+                records.append(CargoRecord(self, self.ids[row], row))
+        return records
+
+    def clear_changes(self):
+        """Forget the change history, e.g. once the store has been saved"""
+        self.changed.clear()
+        self.removed.clear()
+        self.synced_rows = len(self.ids)
+
+    def restore_changes(self, store):
+        """Count the changes of an earlier copy() as unsaved again, e.g. after saving it failed"""
+        for record in store.changed_records():
+            self.mark_changed(record.cargo_id)
+        self.removed.update(cargo_id for cargo_id in store.removed if cargo_id not in self)
+
+    def copy(self):
+        """Return an independent copy of the store, change history included
+
+        The columns are copied as whole arrays, so this is cheap enough to
+        snapshot a large market for saving on another thread.
+        """
+        store = CargoStore()
+        for field, categories in self.categories.items():
+            store.categories[field].names.extend(categories.names)
+            store.categories[field].codes.update(categories.codes)
+        store.ids = self.ids[:]
+        store.alive = self.alive[:]
+        store.columns = {field: column[:] for field, column in self.columns.items()}
+        store.live = self.live
+        store.max_id = self.max_id
+        store.synced_rows = self.synced_rows
+        store.changed = set(self.changed)
+        store.removed = set(self.removed)
+        return store
+
+    def with_status(self, status):
+        """Return the listings with the given status"""
+        code = self.categories["status"].codes.get(status)
+        if code is None:
+            return []
+        ids = self.ids
+        return [CargoRecord(self, ids[row], row)
+                for row, (value, alive) in enumerate(zip(self.columns["status"], self.alive))
+                if alive and value == code]
@@ -0,0 +1,223 @@
+import argparse
+import copy
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import time
+from datetime import date
+
+from cargo_config import load_config, compile_config
+from cargo_montecarlo import run_campaigns, RunningStats, METRICS, CHUNK_RUNS
+
+# Statistics written to the results table for every outcome
+SUMMARY = ("mean", "std", "p5", "p50", "p95")
+
+# Base config of a worker process, and the config of the point it ran last
+_base_config = None
+_point_config = (None, None)
+
+
+def parse_override(text):
+    """Split "name=values" into the setting path and the values text
+
+    name is a key of simulation_settings, with dots for nested keys and
+    list positions (e.g. "cargo_acceptance_thresholds.high_chance" or
+    "new_cargo_per_refresh.1").
+    """
+    name, sep, values = text.partition("=")
+    if not sep or not name or not values:
+        raise ValueError(f"Override must look like name=values, not {text!r}")
+    return name, values
+
+
+def parse_grid(texts):
+    """{name: [values]} from "name=v1,v2,..." overrides"""
+    return {name: [json.loads(value) for value in values.split(",")]
+            for name, values in map(parse_override, texts)}
+
+
+def parse_ranges(texts):
+    """{name: (low, high)} from "name=low:high" overrides"""
+    ranges = {}
+    for name, values in map(parse_override, texts):
+        low, sep, high = values.partition(":")
+        if not sep:
+            raise ValueError(f"Range for {name} must look like low:high, not {values!r}")
+        ranges[name] = (json.loads(low), json.loads(high))
+    return ranges
+
+
+def grid_points(grid):
+    """Every combination of the grid's values, as lists of (name, value)"""
+    names = list(grid)
+    return [list(zip(names, values)) for values in itertools.product(*grid.values())]
+
+
+def sample_points(ranges, count, rng):
+    """count points drawn uniformly from the ranges (whole numbers for integer ranges)"""
+    points = []
+    for _ in range(count):
+        point = []
+        for name, (low, high) in ranges.items():
+            if isinstance(low, int) and isinstance(high, int):
+                point.append((name, rng.randint(low, high)))
+            else:
+                point.append((name, rng.uniform(low, high)))
+        points.append(point)
+    return points
+
+
+def apply_overrides(raw, overrides):
+    """Copy of a raw config with simulation_settings overridden"""
+    raw = copy.deepcopy(raw)
+    for name, value in overrides:
+        keys = name.split(".")
+        target = raw["simulation_settings"]
+        try:
+            for key in keys[:-1]:
+                target = target[int(key) if isinstance(target, list) else key]
+            if isinstance(target, list):
+                last = int(keys[-1])
+                target[last]
+            else:
+                last = keys[-1]
+                if last not in target:
+                    raise KeyError(last)
+        except (KeyError, IndexError, ValueError, TypeError):
+            raise ValueError(f"simulation_settings has no setting {name}") from None
+        target[last] = value
+    return raw
+
+
+def point_config(base, point, overrides):
+    """Compiled config of a sweep point, reusing the base config's tables
+
+    Only simulation_settings differ between points, so the cargo type,
+    world and company tables are shared with base. A worker handles a
+    point's chunks one after the other, so it compiles each point once.
+    """
+    global _point_config
+    if _point_config[0] != point:
+        _point_config = (point, compile_config(apply_overrides(base.raw, overrides), previous=base))
+    return _point_config[1]
+
+
+def init_worker(config):
+    """Keep the base config in the worker, so it is only sent over once"""
+    global _base_config, _point_config
+    _base_config = config
+    _point_config = (None, None)
+
+
+def run_chunk(task):
+    """Run a chunk of one point's campaigns in a worker"""
+    point, overrides, *campaigns = task
+    return point, run_campaigns(point_config(_base_config, point, overrides), *campaigns)
+
+
+def sweep(config, points, output, runs, weeks=52, bids_per_week=5, bid_fraction=0.85, seed=0,
+          workers=None, start_date=None, progress=None):
+    """Run runs campaigns per point across a process pool and write one CSV row per point
+
+    points are lists of (setting, value) overrides. Every point plays the
+    same campaign seeds, so differences between points come from the
+    settings rather than from luck. A point's row is written as soon as
+    all its campaigns are in. progress(done, total) is called as chunks
+    finish.
+    """
+    config = compile_config(config)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if start_date is None:
+        start_date = date.today().toordinal()
+
+    # Fail on a bad override before starting any workers
+    for point in points:
+        apply_overrides(config.raw, point)
+
+    tasks = [(index, point, seed, first, min(CHUNK_RUNS, runs - first), weeks, bids_per_week,
+              bid_fraction, start_date)
+             for index, point in enumerate(points) for first in range(0, runs, CHUNK_RUNS)]
+    names = sorted({name for point in points for name, _ in point})
+
+    with open(output, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["point"] + names + ["runs"] +
+                        [f"{metric}_{stat}" for metric in METRICS for stat in SUMMARY])
+
+        def write_point(index, stats):
+            values = dict(points[index])
+            row = [index] + [values.get(name, "") for name in names] + [runs]
+            for metric in METRICS:
+                s = stats[metric]
+                p5, p50, p95 = s.percentiles((5, 50, 95))
+                row += [round(s.mean, 4), round(s.std, 4), p5, p50, p95]
+            writer.writerow(row)
+            file.flush()
+
+        def collect(results):
+            current, stats, done = None, None, 0
+            for index, chunk in results:
+                if index != current:
+                    if current is not None:
+                        write_point(current, stats)
+                    current, stats = index, {metric: RunningStats() for metric in METRICS}
+                for metric, values in zip(METRICS, chunk):
+                    stats[metric].add_many(values)
+                done += len(chunk[0])
+                if progress:
+                    progress(done, runs * len(points))
+            if current is not None:
+                write_point(current, stats)
+
+        if workers <= 1:
+            init_worker(config)
+            collect(map(run_chunk, tasks))
+        else:
+            with multiprocessing.Pool(workers, initializer=init_worker, initargs=(config,)) as pool:
+                collect(pool.imap(run_chunk, tasks))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep simulation_settings over many campaigns per point")
+    parser.add_argument("--grid", action="append", default=[], metavar="NAME=V1,V2,...",
+                        help="try every listed value of a setting (combined with other --grid options)")
+    parser.add_argument("--range", action="append", default=[], metavar="NAME=LOW:HIGH",
+                        help="draw a setting uniformly from a range (needs --samples)")
+    parser.add_argument("--samples", type=int, default=0, help="random points drawn from the --range options")
+    parser.add_argument("--output", default="sweep_results.csv", help="results CSV file")
+    parser.add_argument("--runs", type=int, default=200, help="campaigns per point")
+    parser.add_argument("--weeks", type=int, default=52, help="weeks per campaign")
+    parser.add_argument("--bids-per-week", type=int, default=5, help="most bids placed each week")
+    parser.add_argument("--bid-fraction", type=float, default=0.85, help="bid as a fraction of cargo value")
+    parser.add_argument("--seed", type=int, default=0, help="seed for campaigns and sampled points")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--config", default=None, help="config file (default: cargo_config.json)")
+    args = parser.parse_args()
+
+    try:
+        grid = grid_points(parse_grid(args.grid))
+        ranges = parse_ranges(args.range)
+    except ValueError as e:
+        parser.error(str(e))
+    if ranges and not args.samples:
+        parser.error("--range needs --samples")
+    # Each sampled point is combined with every grid point
+    if ranges:
+        samples = sample_points(ranges, args.samples, random.Random(args.seed))
+        points = [g + s for g in grid for s in samples]
+    else:
+        points = grid
+
+    config = load_config(args.config) if args.config else load_config()
+    start = time.perf_counter()
+    try:
+        sweep(config, points, args.output, args.runs, args.weeks, args.bids_per_week,
+              args.bid_fraction, args.seed, args.workers)
+    except ValueError as e:
+        parser.error(str(e))
+    elapsed = time.perf_counter() - start
+    print(f"{len(points):,} points x {args.runs:,} campaigns in {elapsed:.2f}s - results in {args.output}")
@@ -0,0 +1,213 @@
+import tkinter as tk
+from tkinter import ttk
+from operator import itemgetter
+
+CARGO_COLUMNS = ("ID", "Cargo Type", "Origin", "Destination", "Mass (tons)",
+                 "Value (cr/ton)", "Total Value", "Shipping Company", "Posted On", "Deadline", "Status")
+
+COLUMN_LAYOUT = {
+    "ID": (40, tk.CENTER),
+    "Cargo Type": (150, tk.W),
+    "Origin": (100, tk.W),
+    "Destination": (100, tk.W),
+    "Mass (tons)": (80, tk.CENTER),
+    "Value (cr/ton)": (100, tk.CENTER),
+    "Total Value": (100, tk.CENTER),
+    "Shipping Company": (150, tk.W),
+    "Posted On": (100, tk.CENTER),
+    "Deadline": (100, tk.CENTER),
+    "Status": (100, tk.CENTER),
+    "Best Bid": (90, tk.CENTER),
+    "Win Chance": (80, tk.CENTER),
+    "Exp. Profit": (90, tk.CENTER)
+}
+
+# Columns added when the view is given a bid advisor, in the order BidAdvisor.advise() returns them
+ADVICE_COLUMNS = ("Best Bid", "Win Chance", "Exp. Profit")
+
+# Cargo record field behind each column, used for sorting on the typed values
+COLUMN_FIELDS = {
+    "ID": "id",
+    "Cargo Type": "cargo_type",
+    "Origin": "origin",
+    "Destination": "destination",
+    "Mass (tons)": "mass",
+    "Value (cr/ton)": "value_per_ton",
+    "Total Value": "total_value",
+    "Shipping Company": "shipping_company",
+    "Posted On": "posted_on",
+    "Deadline": "deadline",
+    "Status": "status"
+}
+
+# Rebuild from scratch when fewer than this share of the shown rows survive an update
+REBUILD_RATIO = 0.5
+
+# Rows materialized in the Treeview at a time
+PAGE_SIZE = 200
+
+
+def format_advice(bid, chance, expected):
+    """Return the Treeview values for a listing's bid advice"""
+    return (f"{int(bid):,}", f"{chance:.0%}", f"{expected:,.0f}")
+
+
+def format_cargo_row(cargo):
+    """Return the Treeview values for a cargo listing"""
+    return (
+        cargo["id"],
+        cargo["cargo_type"],
+        cargo["origin"],
+        cargo["destination"],
+        f"{cargo['mass']:,}",
+        f"{cargo['value_per_ton']:,}",
+        f"{cargo['total_value']:,}",
+        cargo["shipping_company"],
+        cargo["posted_on"],
+        cargo["deadline"],
+        cargo["status"]
+    )
+
+
+class CargoTreeView:
+    """Paged cargo listing Treeview that applies only the rows that changed
+
+    The view keeps the full list of listings but only materializes one page
+    of rows in Tk. Each row's item ID is the cargo ID, and the values last
+    sent to Tk are remembered per row, so redrawing a page only inserts,
+    updates or deletes the rows that actually differ from what is on screen.
+
+    Given a BidAdvisor, the view also shows each listing's best bid. Advice
+    is computed for the page being drawn in one pass, so its cost doesn't
+    grow with the number of listings.
+    """
+
+    def __init__(self, parent, heading_command=None, page_size=PAGE_SIZE, advisor=None):
+        # Page navigation goes below the listing
+        nav_frame = ttk.Frame(parent)
+        nav_frame.pack(side=tk.BOTTOM, fill=tk.X, pady=(5, 0))
+        ttk.Button(nav_frame, text="< Prev", command=lambda: self.show_page(self.page - 1)).pack(side=tk.LEFT, padx=5)
+        self.page_label = ttk.Label(nav_frame, text="")
+        self.page_label.pack(side=tk.LEFT, padx=5)
+        ttk.Button(nav_frame, text="Next >", command=lambda: self.show_page(self.page + 1)).pack(side=tk.LEFT, padx=5)
+
+        self.advisor = advisor
+        columns = CARGO_COLUMNS + (ADVICE_COLUMNS if advisor else ())
+        self.tree = ttk.Treeview(parent, columns=columns, show="headings")
+
+        # Configure columns and headings
+        for col in columns:
+            width, anchor = COLUMN_LAYOUT[col]
+            self.tree.column(col, width=width, anchor=anchor)
+            if heading_command:
+                self.tree.heading(col, text=col, command=lambda c=col: heading_command(c))
+            else:
+                self.tree.heading(col, text=col)
+
+        # Add a scrollbar
+        scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscroll=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        # All listings in display order, and the page of them materialized in Tk
+        self.cargo_rows = []
+        self.page_size = page_size
+        self.page = 0
+
+        # Active sort, kept across refreshes (None keeps the order listings are given in)
+        self.sort_column = None
+        self.sort_reverse = False
+
+        # Cargo ID -> values currently shown for it, in display order
+        self.shown = {}
+
+    def page_count(self):
+        """Number of pages needed for the current listings (at least one)"""
+        return max(1, -(-len(self.cargo_rows) // self.page_size))
+
+    def show(self, cargo_list):
+        """Show the given listings in the active sort order, staying on the current page"""
+        self.cargo_rows = list(cargo_list)
+        if self.sort_column:
+            self.sort_rows()
+        self.show_page(self.page)
+
+    def show_page(self, page):
+        """Materialize one page of the listings in the Treeview"""
+        self.page = min(max(page, 0), self.page_count() - 1)
+        start = self.page * self.page_size
+        self.apply(self.cargo_rows[start:start + self.page_size])
+        self.page_label.config(text=f"Page {self.page + 1} of {self.page_count()} "
+                                    f"({len(self.cargo_rows):,} listings)")
+
+    def sort_by(self, column):
+        """Sort all listings by a column - selecting the same column again reverses the order"""
+        if column == self.sort_column:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            if self.sort_column:
+                self.tree.heading(self.sort_column, text=self.sort_column)
+            self.sort_column = column
+            self.sort_reverse = False
+
+        self.tree.heading(column, text=f"{column} {'v' if self.sort_reverse else '^'}")
+        self.sort_rows()
+        self.show_page(0)
+
+    def sort_rows(self):
+        """Sort all listings on the record values behind the active sort column"""
+        if self.sort_column in ADVICE_COLUMNS:
+            # Advise every listing in one pass and sort on the column's part of it
+            advice = self.advisor.advise_many([cargo["total_value"] for cargo in self.cargo_rows])
+            keys = list(advice[ADVICE_COLUMNS.index(self.sort_column)])
+            order = sorted(range(len(keys)), key=keys.__getitem__, reverse=self.sort_reverse)
+            self.cargo_rows = [self.cargo_rows[index] for index in order]
+            return
+        self.cargo_rows.sort(key=itemgetter(COLUMN_FIELDS[self.sort_column]), reverse=self.sort_reverse)
+
+    def apply(self, cargo_list):
+        """Make the Treeview rows match the given listings, in order"""
+        rows = {cargo["id"]: format_cargo_row(cargo) for cargo in cargo_list}
+        if self.advisor and rows:
+            advice = zip(*self.advisor.advise_many([cargo["total_value"] for cargo in cargo_list]))
+            rows = {cargo_id: values + format_advice(*a) for (cargo_id, values), a in zip(rows.items(), advice)}
+        kept = [cargo_id for cargo_id in self.shown if cargo_id in rows]
+
+        if len(kept) < len(self.shown) * REBUILD_RATIO:
+            self.rebuild(rows)
+            return
+
+        # Remove rows that are no longer listed
+        removed = [str(cargo_id) for cargo_id in self.shown if cargo_id not in rows]
+        if removed:
+            self.tree.delete(*removed)
+
+        # Update changed rows and insert new ones where they belong
+        for index, (cargo_id, values) in enumerate(rows.items()):
+            old_values = self.shown.get(cargo_id)
+            if old_values is None:
+                self.tree.insert("", index, iid=str(cargo_id), values=values)
+            elif old_values != values:
+                self.tree.item(str(cargo_id), values=values)
+
+        # Only reorder when the surviving rows changed their relative order
+        if kept != [cargo_id for cargo_id in rows if cargo_id in self.shown]:
+            for index, cargo_id in enumerate(rows):
+                self.tree.move(str(cargo_id), "", index)
+
+        self.shown = rows
+
+    def rebuild(self, rows):
+        """Replace every row in the Treeview"""
+        self.tree.delete(*self.tree.get_children())
+        for cargo_id, values in rows.items():
+            self.tree.insert("", tk.END, iid=str(cargo_id), values=values)
+        self.shown = rows
+
+    def selected_cargo_id(self):
+        """Return the cargo ID of the selected row, or None if nothing is selected"""
+        selected_item = self.tree.selection()
+        if not selected_item:
+            return None
+        return int(selected_item[0])
@@ -0,0 +1,73 @@
+import queue
+import threading
+import time
+
+# How often the Tk thread checks on background work (milliseconds)
+POLL_MS = 50
+
+# Longest the Tk thread spends on queued messages per check (seconds)
+POLL_BUDGET = 0.02
+
+
+class BackgroundTask:
+    """Run a function on a worker thread and report back on the Tk thread
+
+    work(report) runs on the worker and may call report(value) any number
+    of times. Tk must only be touched from its own thread, so the worker
+    never calls back directly: it queues messages, and a root.after poll
+    hands them to on_progress(value) and finally on_done(result) or
+    on_error(exception) on the Tk thread.
+    """
+
+    def __init__(self, root, work, on_done=None, on_progress=None, on_error=None):
+        self.root = root
+        self.work = work
+        self.on_done = on_done
+        self.on_progress = on_progress
+        self.on_error = on_error
+        self.messages = queue.Queue()
+        self.finished = False
+
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        self.root.after(POLL_MS, self.poll)
+
+    def running(self):
+        """Whether the task hasn't finished (and reported back) yet"""
+        return not self.finished
+
+    def run(self):
+        try:
+            result = self.work(self.report)
+        except Exception as e:
+            self.messages.put(("error", e))
+        else:
+            self.messages.put(("done", result))
+
+    def report(self, value):
+        """Queue a progress value for on_progress (called from the worker)"""
+        self.messages.put(("progress", value))
+
+    def poll(self):
+        """Pass queued messages to the callbacks, then check again later"""
+        deadline = time.monotonic() + POLL_BUDGET
+        while time.monotonic() < deadline:
+            try:
+                kind, value = self.messages.get_nowait()
+            except queue.Empty:
+                break
+
+            if kind == "progress":
+                if self.on_progress:
+                    self.on_progress(value)
+                continue
+
+            self.finished = True
+            if kind == "done":
+                if self.on_done:
+                    self.on_done(value)
+            elif self.on_error:
+                self.on_error(value)
+            return
+
+        self.root.after(POLL_MS, self.poll)
@@ -0,0 +1,53 @@
+import os
+import sys
+
+import pytest
+
+# The cargo modules live at the top of the repository
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cargo_config import load_config
+
+
+def cargo_listing(cargo_id, status="Available"):
+    return {
+        "id": cargo_id,
+        "cargo_type": ("Ore", "Grain", "Machinery")[cargo_id % 3],
+        "origin": "Regina",
+        "destination": ("Terra", "Vland")[cargo_id % 2],
+        "mass": cargo_id % 50 + 1,
+        "value_per_ton": 100 + cargo_id,
+        "total_value": (cargo_id % 50 + 1) * (100 + cargo_id),
+        "shipping_company": "Interstellar Logistics",
+        "posted_on": "2026-01-05",
+        "deadline": "2026-02-02",
+        "status": status
+    }
+
+
+@pytest.fixture
+def make_cargo():
+    """Build a cargo listing dict from an ID (and a status)"""
+    return cargo_listing
+
+
+@pytest.fixture
+def config(tmp_path):
+    """The default config, written next to the test's files"""
+    return load_config(str(tmp_path / "cargo_config.json"))
+
+
+def play_weeks(market, weeks):
+    for _ in range(weeks):
+        for cargo in sorted(market.available_cargo(), key=lambda cargo: cargo["total_value"])[:3]:
+            bid = market.suggested_bid(cargo)
+            if cargo["id"] not in market.current_bids and bid <= market.available_credits():
+                market.place_bid(cargo["id"], bid)
+        market.advance_time()
+        market.refresh_listings()
+
+
+@pytest.fixture
+def play():
+    """Play a market for some weeks, bidding the advised amount on its three cheapest listings each week"""
+    return play_weeks
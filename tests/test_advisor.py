@@ -0,0 +1,52 @@
+import pytest
+
+import cargo_advisor
+from cargo_advisor import BidAdvisor, minimum_bid
+
+# Small enough to try every bid amount on
+SMALL_VALUES = range(1, 1500)
+VALUES = list(SMALL_VALUES) + [9999, 123457, 2000000]
+
+
+def settings(high=0.8, medium=0.6, chances=(0.7, 0.4, 0.2), floor=0.5):
+    return {"simulation_settings": {
+        "cargo_acceptance_thresholds": {"high_chance": high, "medium_chance": medium},
+        "high_win_chance": chances[0], "medium_win_chance": chances[1], "low_win_chance": chances[2],
+        "minimum_bid_fraction": floor
+    }}
+
+
+CONFIGS = [settings(), settings(floor=0.0), settings(floor=0.7), settings(floor=0.9),
+           settings(high=0.95, medium=0.3, chances=(0.9, 0.5, 0.05), floor=0.1)]
+
+
+def brute_force(advisor, value):
+    """Most expected profit of any allowed bid, trying every amount"""
+    return max(advisor.chance(bid, value) * (value - bid)
+               for bid in range(minimum_bid(value, advisor.floor), value + 1))
+
+
+@pytest.mark.parametrize("config", CONFIGS)
+def test_advice_is_the_best_allowed_bid(config):
+    advisor = BidAdvisor(config)
+    for value in SMALL_VALUES:
+        bid, chance, expected = advisor.advise(value)
+        assert bid >= minimum_bid(value, advisor.floor)
+        assert chance == advisor.chance(bid, value)
+        assert expected == pytest.approx(chance * (value - bid))
+        assert expected == pytest.approx(brute_force(advisor, value))
+
+
+@pytest.mark.parametrize("config", CONFIGS)
+@pytest.mark.parametrize("numpy", [True, False])
+def test_advise_many_matches_advise(config, numpy, monkeypatch):
+    if numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(cargo_advisor, "np", None)
+    advisor = BidAdvisor(config)
+    bids, chances, expected = advisor.advise_many(VALUES)
+    for value, advice in zip(VALUES, zip(bids, chances, expected)):
+        bid, chance, profit = advisor.advise(value)
+        assert (int(advice[0]), float(advice[1])) == (bid, chance)
+        assert float(advice[2]) == pytest.approx(profit)
@@ -0,0 +1,46 @@
+import os
+
+import pytest
+
+import cargo_config
+from cargo_config import load_config, RACY_MTIME_NS
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = str(tmp_path / "cargo_config.json")
+    load_config(path)
+    return path
+
+
+def refuse_to_parse(monkeypatch):
+    def loads(data):
+        raise AssertionError("The config was parsed again")
+    monkeypatch.setattr(cargo_config.json, "loads", loads)
+
+
+def test_unchanged_file_is_not_parsed_again(config_path, monkeypatch):
+    # Old enough that a same-size edit would have changed the mtime
+    old = os.stat(config_path).st_mtime_ns - 2 * RACY_MTIME_NS
+    os.utime(config_path, ns=(old, old))
+    config = load_config(config_path)
+
+    refuse_to_parse(monkeypatch)
+    assert load_config(config_path) is config
+    # A new process starts from the cache file
+    cargo_config._config_cache.clear()
+    assert load_config(config_path)["simulation_settings"] == config["simulation_settings"]
+
+
+def test_same_size_edit_within_mtime_resolution_is_reloaded(config_path):
+    stat = os.stat(config_path)
+    with open(config_path) as f:
+        text = f.read()
+    edited = text.replace('"high_win_chance": 0.7', '"high_win_chance": 0.6')
+    assert edited != text and len(edited) == len(text)
+
+    # Written within the same mtime tick as the version that was loaded
+    with open(config_path, "w") as f:
+        f.write(edited)
+    os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert load_config(config_path)["simulation_settings"]["high_win_chance"] == 0.6
@@ -0,0 +1,90 @@
+from cargo_engine import CargoMarket
+from cargo_save import read_bid_archive, ARCHIVE_SUFFIX
+from cargo_journal import Journal, read_journal, has_journal, journal_path, OLD_SUFFIX
+
+START = 739000
+
+
+def test_entries_read_back_in_order(tmp_path):
+    save = str(tmp_path / "save.csv")
+    journal = Journal(save)
+    journal.write("date", 739007)
+    journal.write_many("drop", [(1,), (2,)])
+    journal.close()
+
+    assert list(read_journal(save)) == [("date", ["739007"]), ("drop", ["1"]), ("drop", ["2"])]
+    assert has_journal(save)
+
+
+def test_torn_last_line_is_skipped(tmp_path):
+    save = str(tmp_path / "save.csv")
+    journal = Journal(save)
+    journal.write("date", 739007)
+    journal.close()
+    with open(journal_path(save), "a") as file:
+        file.write("bid,5,90")
+
+    assert list(read_journal(save)) == [("date", ["739007"])]
+
+
+def test_unfinished_snapshot_keeps_old_entries(tmp_path):
+    save = str(tmp_path / "save.csv")
+    journal = Journal(save)
+    journal.write("date", 1)
+    journal.begin_snapshot()
+    journal.write("date", 2)
+    # A second snapshot starts before the first one finished
+    journal.begin_snapshot()
+    journal.write("date", 3)
+
+    assert [values for _, values in read_journal(save)] == [["1"], ["2"], ["3"]]
+    journal.end_snapshot()
+    assert [values for _, values in read_journal(save)] == [["3"]]
+    journal.close()
+    assert not (tmp_path / ("save.csv.journal" + OLD_SUFFIX)).exists()
+
+
+def test_recovery_replays_unsaved_changes(tmp_path, config, play):
+    save = str(tmp_path / "save.csv")
+    market = CargoMarket(config, seed=1, start_date=START)
+    market.generate_cargo(200)
+    market.save_game(save)
+    play(market, 8)
+
+    recovered = CargoMarket(config, seed=1, start_date=START)
+    recovered.load_game(save, recover=True)
+    assert recovered.state_digest() == market.state_digest()
+    assert recovered.player_credits == market.player_credits
+    assert recovered.archived == market.archived
+    assert recovered.archive_rows == market.archive_rows
+
+
+def test_load_drops_unsaved_changes(tmp_path, config, play):
+    save = str(tmp_path / "save.db")
+    market = CargoMarket(config, seed=2, start_date=START)
+    market.generate_cargo(200)
+    market.save_game(save)
+    saved = market.state_digest()
+    play(market, 4)
+
+    market.load_game(save)
+    assert market.state_digest() == saved
+    assert not has_journal(save)
+
+
+
+def test_archive_only_holds_saved_bids(tmp_path, config, play):
+    save = str(tmp_path / "save.csv")
+    market = CargoMarket(config, seed=3, start_date=START)
+    market.generate_cargo(200)
+    market.save_game(save)
+    play(market, 10)
+    assert market.archive_rows
+
+    # Bids archived after the save go with the unsaved changes
+    market.load_game(save)
+    play(market, 10)
+    market.save_game(save)
+
+    archived = [(bid["cargo_id"], bid["bid_date"]) for bid in read_bid_archive(save + ARCHIVE_SUFFIX)]
+    assert len(archived) == len(set(archived)) == market.archived["accepted"] + market.archived["rejected"]
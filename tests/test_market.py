@@ -0,0 +1,23 @@
+from cargo_engine import CargoMarket
+from cargo_store import date_to_ordinal, ordinal_to_date
+
+START = date_to_ordinal("2026-01-05")
+
+
+def test_refresh_expires_exactly_the_listings_past_their_deadline(config, make_cargo):
+    market = CargoMarket(config, seed=1, start_date=START, queue_events=True)
+    deadlines = {}
+    listings = []
+    for cargo_id in range(1, 61):
+        deadlines[cargo_id] = START + cargo_id % 30
+        listings.append(dict(make_cargo(cargo_id), deadline=ordinal_to_date(deadlines[cargo_id])))
+    market.post_cargo(listings)
+
+    expired = set()
+    for today in range(START, START + 32, 3):
+        market.today = today
+        market.refresh_listings()
+        expired.update(event["cargo_id"] for event in market.drain_events() if event["kind"] == "cargo_expired")
+        for cargo_id, deadline in deadlines.items():
+            assert (cargo_id in market.cargo) == (deadline > today)
+            assert (cargo_id in expired) == (deadline <= today)
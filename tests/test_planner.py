@@ -0,0 +1,97 @@
+import random
+from itertools import combinations
+
+import pytest
+
+import cargo_planner
+from cargo_advisor import BidAdvisor
+from cargo_planner import knapsack, plan_hold, plan_route
+from cargo_store import date_to_ordinal, ordinal_to_date
+
+WORLDS = ["Regina", "Terra", "Vland", "Efate"]
+TODAY = 739000
+
+
+def subsets(count):
+    for size in range(count + 1):
+        yield from combinations(range(count), size)
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("numpy", [True, False])
+def test_knapsack_matches_brute_force(seed, numpy, monkeypatch):
+    if numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(cargo_planner, "np", None)
+    rng = random.Random(seed)
+    masses = [rng.randint(1, 40) for _ in range(12)]
+    profits = [rng.uniform(1, 100) for _ in range(12)]
+    capacity = 100
+
+    chosen = knapsack(masses, profits, capacity)
+    assert sum(masses[i] for i in chosen) <= capacity
+    best = max(sum(profits[i] for i in subset) for subset in subsets(12)
+               if sum(masses[i] for i in subset) <= capacity)
+    assert sum(profits[i] for i in chosen) == pytest.approx(best)
+
+
+def make_listings(rng, count):
+    return [{"id": cargo_id, "status": "Available", "origin": "Regina", "destination": rng.choice(WORLDS[1:]),
+             "mass": rng.randint(5, 60), "total_value": rng.randint(1000, 50000), "deadline": "2026-03-02"}
+            for cargo_id in range(1, count + 1)]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_hold_plan_stays_within_a_binding_budget(seed, config):
+    rng = random.Random(seed)
+    advisor = BidAdvisor(config)
+    listings = make_listings(rng, 12)
+    hold_tons = 150
+    advice = [advisor.advise(cargo["total_value"]) for cargo in listings]
+    # Too little for the best hold without a budget
+    unlimited = knapsack([cargo["mass"] for cargo in listings], [expected for _, _, expected in advice], hold_tons)
+    budget = sum(advice[i][0] for i in unlimited) // 2
+
+    plan = plan_hold(listings, advisor, hold_tons, budget, "Regina")
+    assert plan["bids"] <= budget
+    assert plan["mass"] <= hold_tons
+    chosen = [cargo["id"] - 1 for cargo in plan["cargo"]]
+    assert plan["bids"] == sum(advice[i][0] for i in chosen)
+
+    # The plan can't beat the best selection within budget, and the bound can't be below it
+    best = max(sum(advice[i][2] for i in subset) for subset in subsets(len(listings))
+               if sum(listings[i]["mass"] for i in subset) <= hold_tons
+               and sum(advice[i][0] for i in subset) <= budget)
+    assert plan["expected_profit"] <= best + 1e-6
+    assert plan["bound"] >= best - 1e-6
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_route_meets_deadlines_and_uses_each_contract_once(seed, config):
+    rng = random.Random(seed)
+    advisor = BidAdvisor(config)
+    listings = []
+    for cargo_id in range(1, 41):
+        origin, destination = rng.sample(WORLDS, 2)
+        listings.append({"id": cargo_id, "status": "Available", "origin": origin, "destination": destination,
+                         "mass": rng.randint(5, 60), "total_value": rng.randint(1000, 50000),
+                         "deadline": ordinal_to_date(TODAY + rng.randint(5, 42))})
+
+    route = plan_route(listings, advisor, "Regina", TODAY, 6)
+    assert route["legs"]
+    world = "Regina"
+    profit = 0.0
+    used = set()
+    for week, (leg_week, origin, destination, cargo) in enumerate(route["legs"]):
+        assert (leg_week, origin) == (week, world)
+        if cargo is not None:
+            assert (cargo["origin"], cargo["destination"]) == (origin, destination)
+            # Delivered at the end of the week it was picked up in
+            assert date_to_ordinal(cargo["deadline"]) >= TODAY + 7 * (week + 1)
+            assert cargo["id"] not in used
+            used.add(cargo["id"])
+            profit += advisor.advise(cargo["total_value"])[2]
+        world = destination
+    assert len(route["legs"]) == route["weeks"]
+    assert profit == pytest.approx(route["profit"])
@@ -0,0 +1,37 @@
+import copy
+
+import pytest
+
+from cargo_engine import CargoMarket
+from cargo_replay import replay, write_action_log, read_action_log
+
+START = 739000
+
+
+def test_replay_reaches_the_recorded_state(tmp_path, config, play):
+    market = CargoMarket(config, seed=5, start_date=START, record_actions=True)
+    market.generate_cargo(300)
+    play(market, 6)
+    market.set_weight("destinations", config.destinations[0], 5.0)
+    edited = copy.deepcopy(config.raw)
+    edited["simulation_settings"]["high_win_chance"] = 0.6
+    market.set_config(edited)
+    play(market, 6)
+    market.advance_weeks(3)
+
+    path = str(tmp_path / "actions.json")
+    write_action_log(market, path)
+    replayed = replay(read_action_log(path))
+    assert replayed.state_digest() == market.state_digest()
+    assert replayed.player_credits == market.player_credits
+
+
+def test_logs_that_load_a_save_are_refused(tmp_path, config):
+    market = CargoMarket(config, seed=6, start_date=START, record_actions=True)
+    market.generate_cargo(20)
+    save = str(tmp_path / "save.csv")
+    market.save_game(save)
+    market.load_game(save)
+
+    with pytest.raises(ValueError):
+        replay(market.action_log())
@@ -0,0 +1,65 @@
+import random
+from collections import Counter
+
+import pytest
+
+from cargo_sampling import AliasTable
+
+DRAWS = 200000
+
+
+def frequencies(table, rng):
+    counts = Counter(table.sample(rng) for _ in range(DRAWS))
+    return [counts[index] / DRAWS for index in range(len(table))]
+
+
+def assert_matches(observed, weights):
+    total = sum(weights)
+    for frequency, weight in zip(observed, weights):
+        expected = weight / total
+        # Five standard errors of a binomial proportion
+        assert abs(frequency - expected) <= 5 * (expected * (1 - expected) / DRAWS) ** 0.5 + 1e-9
+
+
+@pytest.mark.parametrize("weights", [[1, 1, 1, 1], [3, 3, 2, 2, 1, 1, 1], [0.5, 10, 0.01, 2], [7]])
+def test_draws_follow_weights(weights):
+    table = AliasTable(weights)
+    assert_matches(frequencies(table, random.Random(1)), weights)
+
+
+def test_zero_weight_is_never_drawn():
+    table = AliasTable([0, 1, 0, 2])
+    assert frequencies(table, random.Random(2))[0::2] == [0, 0]
+
+
+def test_changed_weights_take_effect():
+    table = AliasTable([1, 1, 1, 1])
+    # Within the capacity (no rebuild), past it and back down again
+    table.set_weight(0, 0.5)
+    table.set_weight(1, 6)
+    table.set_weight(2, 0)
+    weights = [0.5, 6, 0, 1]
+    assert_matches(frequencies(table, random.Random(3)), weights)
+
+    table.set_weight(1, 1)
+    assert_matches(frequencies(table, random.Random(4)), [0.5, 1, 0, 1])
+
+
+def test_bad_weights_are_rejected():
+    with pytest.raises(ValueError):
+        AliasTable([0, 0])
+    with pytest.raises(ValueError):
+        AliasTable([1, -1])
+    table = AliasTable([1, 0])
+    with pytest.raises(ValueError):
+        table.set_weight(0, 0)
+
+
+def test_array_draws_follow_weights():
+    np = pytest.importorskip("numpy")
+    weights = [3, 3, 2, 2, 1, 1, 1]
+    table = AliasTable(weights)
+    table.set_weight(4, 5)
+    weights[4] = 5
+    draws = table.sample_array(np.random.default_rng(5), DRAWS)
+    assert_matches(np.bincount(draws, minlength=len(weights)) / DRAWS, weights)
@@ -0,0 +1,108 @@
+from cargo_engine import CargoMarket
+from cargo_save import (write_csv_save, read_csv_save, read_save, append_bid_archive, read_bid_archive,
+                        resolve_bids, SqliteSave)
+from cargo_store import CargoStore
+
+PLAYER = {"credits": 12345, "game_date": 739000, "archived_accepted": 2, "archived_rejected": 3,
+          "archived_accepted_value": 4000}
+
+
+def make_game(make_cargo):
+    store = CargoStore(make_cargo(cargo_id) for cargo_id in range(1, 51))
+    store.set_field(7, "status", "Contracted")
+    bids = {7: {"amount": 900, "status": "Accepted", "bid_date": "2026-01-12", "cargo": store.get(7)},
+            9: {"amount": 500, "status": "Pending", "bid_date": "2026-01-19", "cargo": store.get(9)}}
+    return store, bids
+
+
+def read_back(path, statuses=None):
+    sections = {"cargo": [], "bids": [], "player": []}
+    for section, record in read_save(path, statuses):
+        sections[section].append(record)
+    return sections
+
+
+def test_csv_round_trip(tmp_path, make_cargo):
+    path = str(tmp_path / "save.csv")
+    store, bids = make_game(make_cargo)
+    write_csv_save(path, store, bids, PLAYER)
+
+    saved = read_back(path)
+    assert saved["cargo"] == [record.as_dict() for record in store]
+    assert saved["player"] == [PLAYER]
+    loaded = resolve_bids(saved["bids"], CargoStore(saved["cargo"]))
+    assert loaded.keys() == bids.keys()
+    for cargo_id, bid in bids.items():
+        assert loaded[cargo_id] == bid
+
+
+def test_csv_reads_only_what_is_asked(tmp_path, make_cargo):
+    path = str(tmp_path / "save.csv")
+    store, bids = make_game(make_cargo)
+    write_csv_save(path, store, bids, PLAYER)
+
+    assert [record["id"] for _, record in read_csv_save(path, ("cargo",), {"Contracted"})] == [7]
+    assert list(read_csv_save(path, ("player",))) == [("player", PLAYER)]
+
+
+def test_sqlite_incremental_round_trip(tmp_path, make_cargo):
+    path = str(tmp_path / "save.db")
+    store, bids = make_game(make_cargo)
+    with SqliteSave(path) as save:
+        with save.conn:
+            save.write_cargo(store, full=True)
+            save.write_bids(bids, full=True)
+            save.write_player(PLAYER)
+    store.clear_changes()
+
+    # Only the changes are written the second time
+    store.set_field(3, "status", "Contracted")
+    store.remove(4)
+    store.add(make_cargo(51))
+    del bids[9]
+    with SqliteSave(path) as save:
+        with save.conn:
+            save.write_cargo(store)
+            save.write_bids(bids, changed_ids={9})
+
+    saved = read_back(path)
+    assert saved["cargo"] == [record.as_dict() for record in store]
+    assert [bid["cargo_id"] for bid in saved["bids"]] == [7]
+    assert saved["player"] == [PLAYER]
+    assert [record["id"] for record in read_back(path, {"Contracted"})["cargo"]] == [3, 7]
+
+
+def test_sqlite_writers_never_share_ids(tmp_path, make_cargo, config):
+    path = str(tmp_path / "save.db")
+    market = CargoMarket(config, seed=3, start_date=739000, id_path=path)
+    market.generate_cargo(5)
+
+    # The editor adds a listing before the game is first saved, and another one after
+    with SqliteSave(path) as save:
+        editor_ids = [save.reserve_ids(1, 1)]
+        with save.conn:
+            save.write_cargo(CargoStore([make_cargo(editor_ids[0])]))
+    market.save_game(path)
+    market.generate_cargo(5)
+    with SqliteSave(path) as save:
+        editor_ids.append(save.reserve_ids(1, 1))
+        with save.conn:
+            save.write_cargo(CargoStore([make_cargo(editor_ids[1])]))
+    market.save_game(path)
+
+    saved = {record["id"]: record for record in read_back(path)["cargo"]}
+    assert len(saved) == 12
+    for cargo_id in editor_ids:
+        assert saved[cargo_id] == make_cargo(cargo_id)
+    for record in market.cargo:
+        assert saved[record["id"]] == record.as_dict()
+
+
+def test_bid_archive_appends(tmp_path):
+    path = str(tmp_path / "save.csv.archive.csv")
+    rows = [(1, 900, "Accepted", "2026-01-12", "Ore", "Regina", "Terra", 1000),
+            (2, 100, "Rejected", "2026-01-19", "Grain", "Regina", "Vland", 2000)]
+    append_bid_archive(path, rows[:1])
+    append_bid_archive(path, rows[1:])
+
+    assert [tuple(bid.values()) for bid in read_bid_archive(path)] == rows
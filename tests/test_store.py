@@ -0,0 +1,102 @@
+import pytest
+
+from cargo_store import CargoStore, CARGO_FIELDS, COMPACT_MIN_ROWS
+
+
+def test_round_trip(make_cargo):
+    cargo = [make_cargo(cargo_id) for cargo_id in range(1, 101)]
+    store = CargoStore(cargo)
+
+    assert len(store) == 100
+    assert store.get(42).as_dict() == cargo[41]
+    assert [record.as_dict() for record in store] == cargo
+    assert list(store.rows()) == [tuple(c[field] for field in CARGO_FIELDS) for c in cargo]
+    assert store.get(101) is None
+
+
+def test_out_of_order_ids_stay_sorted(make_cargo):
+    store = CargoStore([make_cargo(10), make_cargo(30)])
+    store.add(make_cargo(20))
+
+    assert [record["id"] for record in store] == [10, 20, 30]
+    assert store.next_id() == 31
+
+
+def test_records_follow_their_listing_through_compaction(make_cargo):
+    count = 3 * COMPACT_MIN_ROWS
+    store = CargoStore(make_cargo(cargo_id) for cargo_id in range(1, count + 1))
+    kept = store.get(count)
+
+    # The last removal makes removed rows outnumber live ones, so the arrays are compacted
+    removed = [store.remove(cargo_id) for cargo_id in range(1, count // 2 + 2)]
+    assert removed[0] == make_cargo(1)
+    assert len(store.ids) == len(store) == count // 2 - 1
+    assert kept["total_value"] == make_cargo(count)["total_value"]
+    assert [record["id"] for record in store] == list(range(count // 2 + 2, count + 1))
+    assert store.remove(1) is None
+    assert store.discard(count) and not store.discard(count)
+
+
+def test_changes_since_last_save(make_cargo):
+    store = CargoStore(make_cargo(cargo_id) for cargo_id in range(1, 11))
+    store.clear_changes()
+    assert store.synced_rows == 10
+    assert store.changed_records() == []
+
+    store.set_field(3, "status", "Contracted")
+    store.remove(5)
+    store.add(make_cargo(11))
+
+    assert sorted(record["id"] for record in store.changed_records()) == [3, 11]
+    assert store.removed == {5}
+    assert store.get(3)["status"] == "Contracted"
+
+
+def test_synced_rows_survive_compaction(make_cargo):
+    count = 3 * COMPACT_MIN_ROWS
+    store = CargoStore(make_cargo(cargo_id) for cargo_id in range(1, count + 1))
+    store.clear_changes()
+    store.add(make_cargo(count + 1))
+
+    for cargo_id in range(1, count // 2 + 2):
+        store.remove(cargo_id)
+
+    # Only the listing added after the save counts as new
+    assert len(store.ids) == len(store)
+    assert store.synced_rows == len(store) - 1
+    assert [record["id"] for record in store.changed_records()] == [count + 1]
+
+
+def test_copy_is_independent(make_cargo):
+    store = CargoStore(make_cargo(cargo_id) for cargo_id in range(1, 6))
+    copy = store.copy()
+    store.set_field(1, "status", "Contracted")
+    store.remove(2)
+
+    assert copy.get(1)["status"] == "Available"
+    assert 2 in copy and 2 not in store
+    assert sorted(record["id"] for record in copy.changed_records()) == [1, 2, 3, 4, 5]
+
+
+def test_unknown_fields_are_rejected(make_cargo):
+    store = CargoStore([make_cargo(1)])
+    with pytest.raises(KeyError):
+        store.set_field(1, "id", 2)
+    with pytest.raises(KeyError):
+        store.set_field(2, "status", "Contracted")
+
+
+def test_failed_save_changes_are_restored(make_cargo):
+    store = CargoStore(make_cargo(cargo_id) for cargo_id in range(1, 11))
+    store.clear_changes()
+    store.set_field(3, "status", "Contracted")
+    store.remove(5)
+    store.add(make_cargo(11))
+
+    saving = store.copy()
+    store.clear_changes()
+    store.set_field(4, "status", "Contracted")
+    store.restore_changes(saving)
+
+    assert sorted(record["id"] for record in store.changed_records()) == [3, 4, 11]
+    assert store.removed == {5}